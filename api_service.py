@@ -1,25 +1,36 @@
 from __future__ import annotations
 import os
-import json
+import asyncio
 import logging
-import re
-from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from commentary_schema import MarketContextInput
+import hashlib
+import types
+import orjson
+import numpy as np
+import httpx
+from typing import List, Optional, Dict, Any, Tuple, Union, AsyncIterator
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from commentary_schema import MarketContextInput, PERIOD_FORMAT_MSG, is_valid_period
 from ingest_normalize import (
-    build_market_context_payload,
-    daily_prices_for_benchmark,
+    build_market_context_payload_async,
+    daily_prices_for_benchmark_async,
     detect_outsized_moves_from_prices,
-    curated_macro_calendar,
+    curated_macro_calendar_async,
+    parse_period,
+    PeriodSpec,
+    collect_av_notes,
 )
-from generate_market_context import generate_market_context
+from generate_market_context import generate_market_context_async, generate_market_context_stream, aclose_async_client
+from result_cache import AsyncLRUCache, Expiring, RedisResultStore, RESULT_TTL_S, cache_key
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi import Query
+from fastapi.exceptions import RequestValidationError
 from datetime import date
-from fastapi.responses import PlainTextResponse, HTMLResponse
+from fastapi.responses import PlainTextResponse, HTMLResponse, Response, JSONResponse, StreamingResponse
 
-PRESETS = [
+PRESETS = (
     {"id": "us_large_core", "label": "U.S. equities (large-cap core)", "benchmark": "S&P 500"},
     {"id": "us_all_cap_core", "label": "U.S. equities (all-cap core)", "benchmark": "Russell 3000"},
     {"id": "us_small_cap", "label": "U.S. equities (small-cap)", "benchmark": "Russell 2000"},
@@ -31,9 +42,9 @@ PRESETS = [
     {"id": "em_equity", "label": "Emerging markets equities", "benchmark": "MSCI Emerging Markets"},
     {"id": "us_equal_weight", "label": "U.S. equities (equal-weight)", "benchmark": "S&P 500 Equal Weight"},
     {"id": "global_growth_tech", "label": "Global large-cap growth (tech tilt)", "benchmark": "NASDAQ-100"},
-]
+)
 
-BENCHMARK_MAP = {
+BENCHMARK_MAP = types.MappingProxyType({
     "S&P 500": {"symbol": "SPY", "source": "databento_or_alpha"},
     "S&P 500 Equal Weight": {"symbol": "RSP", "source": "databento_or_alpha"},
     "Russell 3000": {"symbol": "IWV", "source": "databento_or_alpha"},
@@ -46,21 +57,52 @@ BENCHMARK_MAP = {
     "MSCI EAFE": {"symbol": "EFA", "source": "databento_or_alpha"},
     "MSCI Emerging Markets": {"symbol": "EEM", "source": "databento_or_alpha"},
     "NASDAQ-100": {"symbol": "QQQ", "source": "databento_or_alpha"},
-}
+})
 
 
-app = FastAPI(title="Market Context Generator", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled client for upstream market data; HTTP/2 multiplexes concurrent fetches
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+        timeout=httpx.Timeout(10.0, connect=2.0),
+    )
+    # shared cache across Uvicorn workers; only enabled when REDIS_URL is set
+    app.state.results_store = None
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        import redis.asyncio as aioredis
+        client = aioredis.Redis.from_url(redis_url, max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "50")))
+        app.state.results_store = RedisResultStore(client)
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        await aclose_async_client()
+        if app.state.results_store is not None:
+            await app.state.results_store.redis.aclose()
+
+class FastJSONResponse(JSONResponse):
+    # events come out of pandas/numpy; serialize those natively instead of falling back
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+app = FastAPI(title="Market Context Generator", version="0.1.0", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]
 )
+# added last so it wraps CORS: compresses the final response, headers included
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 @app.get("/", response_class=PlainTextResponse)
 def root():
-    return "Market Context Generator API\n\nTry:\n- GET /health\n- GET /docs\n- GET /market-context/raw?period=Q2%202025&market_region=U.S.%20equities%20(small-cap)&benchmark=Russell%202000\n- GET /ui\n"
+    return "Market Context Generator API\n\nTry:\n- GET /health\n- GET /docs\n- GET /market-context/raw?period=Q2%202025&market_region=U.S.%20equities%20(small-cap)&benchmark=Russell%202000\n- GET /market-context/stream?period=Q2%202025&market_region=U.S.%20equities%20(small-cap)&benchmark=Russell%202000\n- GET /app\n- GET /ui\n"
 
 @app.get("/market-context/raw", response_class=PlainTextResponse)
-def market_context_raw(
+async def market_context_raw(
     period: str = Query(..., description="Q# YYYY or YYYY-MM-DD to YYYY-MM-DD"),
     market_region: str = Query(...),
     benchmark: str = Query(...),
@@ -69,55 +111,42 @@ def market_context_raw(
     z_threshold: float = Query(1.5),
     max_events: int = Query(3),
 ):
-    payload = build_market_context_payload(
+    req = GenerateRequest(
         period=period,
         market_region=market_region,
         benchmark=benchmark,
-        index_level_events=None,
-        qualitative_market_move=None,
-    )
-    px = daily_prices_for_benchmark(payload.period, payload.benchmark)
-    events = detect_outsized_moves_from_prices(px, z=z_threshold, max_events=max_events)
-    cal = curated_macro_calendar(payload.period)
-    md = generate_market_context(
-        payload=payload,
-        events=events,
-        calendar_hints=cal,
-        max_retries=2,
         para_min=para_min,
         para_max=para_max,
+        z_threshold=z_threshold,
+        max_events=max_events,
     )
+    _check_request(req)
+    md, _, _ = await _cached_generate(req)
     return md + "\n"
 
-def _quarters_desc(start_q="Q2 2025", end_q="Q1 2023"):
-    def parse(qs):
-        q, y = qs.split()
-        return int(y), int(q[1])
-    def step_back(y, q):
-        if q > 1: return y, q-1
-        return y-1, 4
-    y, q = parse(start_q)
-    ye, qe = parse(end_q)
-    out = []
-    while (y > ye) or (y == ye and q >= qe):
-        out.append(f"Q{q} {y}")
-        y, q = step_back(y, q)
-    return out
+def _quarters_desc(start: Tuple[int, int] = (2025, 2), end: Tuple[int, int] = (2023, 1)) -> Tuple[str, ...]:
+    # (year, quarter) pairs as a single quarter index: k = 4*year + quarter - 1
+    k0 = start[0] * 4 + start[1] - 1
+    n = k0 - (end[0] * 4 + end[1] - 1) + 1
+    return tuple(f"Q{(k0 - i) % 4 + 1} {(k0 - i) // 4}" for i in range(n))
+
+_QUARTERS = _quarters_desc()
+
+# static content: serialize once at import, not per request
+_PRESETS_JSON = orjson.dumps({
+    "quarters": _QUARTERS,
+    "regions": PRESETS,
+    "benchmarks": tuple(BENCHMARK_MAP.keys()),
+})
 
 @app.get("/presets")
-def presets():
-    return {
-        "quarters": _quarters_desc("Q2 2025", "Q1 2023"),
-        "regions": PRESETS,
-        "benchmarks": list(BENCHMARK_MAP.keys()),
-    }
+async def presets():
+    return Response(content=_PRESETS_JSON, media_type="application/json")
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mcg")
 
-FORBIDDEN = re.compile(r'\b(we|our|us|the fund|portfolio|overweight|underweight|selection|allocation)\b', re.I)
-
 class GenerateRequest(BaseModel):
     period: str = Field(..., description="Q# YYYY or YYYY-MM-DD to YYYY-MM-DD")
     market_region: str = Field(..., description="e.g., U.S. equities (small-cap)")
@@ -134,55 +163,258 @@ class GenerateResponse(BaseModel):
     events: List[Dict[str, Any]]
     stats: Dict[str, int]
 
-def _word_count(s: str) -> int:
-    return len(re.findall(r"\b\w[\w%\-/.]*\b", s))
-
-def _para_count(s: str) -> int:
-    return len([p for p in re.split(r"\n\s*\n", s.strip()) if p.strip()])
+# code point classes for _count_stats; non-ASCII code points are classified on the fly
+_ASCII_WORD = np.array([chr(c).isalnum() or c == ord("_") for c in range(128)])
+_ASCII_SPACE = np.array([chr(c).isspace() for c in range(128)])
+_WORD_JOINERS = np.array([ord(c) for c in "%-/."], dtype=np.uint32)
+
+def _count_stats(s: str) -> Tuple[int, int]:
+    r"""Word and paragraph counts of ``s`` from one vectorized pass.
+
+    Matches ``re.findall(r"\b\w[\w%\-/.]*\b")`` and a split on blank lines:
+    a word is a run of ``[\w%-/.]`` containing at least one ``\w``; paragraphs
+    are groups of non-blank lines separated by blank ones.
+    """
+    cp = np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32)
+    if cp.size == 0:
+        return 0, 0
+    is_ascii = cp < 128
+    is_word = np.zeros(cp.size, dtype=bool)
+    is_space = np.zeros(cp.size, dtype=bool)
+    is_word[is_ascii] = _ASCII_WORD[cp[is_ascii]]
+    is_space[is_ascii] = _ASCII_SPACE[cp[is_ascii]]
+    if not is_ascii.all():
+        uniq, inv = np.unique(cp[~is_ascii], return_inverse=True)
+        chars = [chr(c) for c in uniq]
+        is_word[~is_ascii] = np.array([c.isalnum() for c in chars])[inv]
+        is_space[~is_ascii] = np.array([c.isspace() for c in chars])[inv]
+
+    in_run = is_word | np.isin(cp, _WORD_JOINERS)
+    run_id = np.cumsum(in_run & ~np.concatenate(([False], in_run[:-1])))
+    word_runs = run_id[is_word]
+    words = int(word_runs.size and 1 + np.count_nonzero(np.diff(word_runs)))
+
+    line_id = np.cumsum(cp == 10)
+    filled = line_id[~is_space]
+    lines = filled[np.concatenate(([True], np.diff(filled) != 0))] if filled.size else filled
+    paras = int(lines.size and 1 + np.count_nonzero(np.diff(lines) > 1))
+    return words, paras
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
-@app.post("/market-context", response_model=GenerateResponse)
-def generate(req: GenerateRequest):
+async def _detect_events(period: PeriodSpec, benchmark: str, z: float, max_events: int) -> List[Dict[str, Any]]:
+    # runs as soon as prices land, overlapping with the macro calendar fetch
+    px = await daily_prices_for_benchmark_async(period, benchmark, client=getattr(app.state, "http", None))
+    return await asyncio.to_thread(detect_outsized_moves_from_prices, px, z=z, max_events=max_events)
+
+def _check_request(req: GenerateRequest) -> None:
+    # cheap checks first: malformed input never reaches the caches or upstream APIs
+    if not is_valid_period(req.period):
+        raise HTTPException(status_code=400, detail=PERIOD_FORMAT_MSG)
+    if req.benchmark not in BENCHMARK_MAP:
+        raise HTTPException(status_code=400, detail=f"unsupported benchmark: {req.benchmark}")
+
+async def _build_payload(req: GenerateRequest) -> MarketContextInput:
     try:
-        payload: MarketContextInput = build_market_context_payload(
-            period=req.period,
+        return await build_market_context_payload_async(
+            period=parse_period(req.period),
             market_region=req.market_region,
             benchmark=req.benchmark,
             index_level_events=None,
             qualitative_market_move=None,
+            client=getattr(app.state, "http", None),
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"payload build/validation error: {str(e)}")
 
+async def _events_and_calendar(req: GenerateRequest, payload: MarketContextInput) -> Tuple[List[Dict[str, Any]], List[str]]:
+    spec = parse_period(req.period)
+    return await asyncio.gather(
+        _detect_events(spec, payload.benchmark, req.z_threshold, req.max_events),
+        curated_macro_calendar_async(spec, client=getattr(app.state, "http", None)),
+    )
+
+async def _run_pipeline(req: GenerateRequest) -> Tuple[str, List[Dict[str, Any]], MarketContextInput]:
+    payload = await _build_payload(req)
     try:
-        px = daily_prices_for_benchmark(payload.period, payload.benchmark)
-        events = detect_outsized_moves_from_prices(px, z=req.z_threshold, max_events=req.max_events)
-        cal = curated_macro_calendar(payload.period)
-        md = generate_market_context(
+        events, cal = await _events_and_calendar(req, payload)
+        md = await generate_market_context_async(
             payload=payload,
             events=events,
             calendar_hints=cal,
             max_retries=2,
             para_min=req.para_min,
             para_max=req.para_max,
+            model=req.openai_model,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"generation error: {str(e)}")
+    return md, events, payload
+
+# identical requests (same inputs + model) reuse the previous LLM result;
+# same TTL as Redis, and a copy of a Redis hit only lives as long as the Redis entry has left
+_RESULTS = AsyncLRUCache(maxsize=512, ttl_s=RESULT_TTL_S)
+
+async def _shared_get(key: str) -> Optional[Expiring]:
+    store: Optional[RedisResultStore] = getattr(app.state, "results_store", None)
+    if store is None:
+        return None
+    hit = await store.get(key)
+    if hit is None:
+        return None
+    value, ttl_s = hit
+    return Expiring((value["md"], value["events"], MarketContextInput.model_validate(value["payload"])), ttl_s)
+
+async def _shared_set(key: str, md: str, events: List[Dict[str, Any]], payload: MarketContextInput) -> None:
+    store: Optional[RedisResultStore] = getattr(app.state, "results_store", None)
+    if store is not None:
+        await store.set(key, {"md": md, "events": events, "payload": orjson.Fragment(payload.model_dump_json())})
+
+async def _shared_generate(req: GenerateRequest, key: str) -> Union[Expiring, Tuple[str, List[Dict[str, Any]], MarketContextInput]]:
+    hit = await _shared_get(key)
+    if hit is not None:
+        return hit
+    with collect_av_notes() as notes:
+        md, events, payload = await _run_pipeline(req)
+    if notes:
+        # built on rate-limited or errored upstream data: serve it, cache it nowhere
+        return Expiring((md, events, payload), 0)
+    await _shared_set(key, md, events, payload)
+    return md, events, payload
+
+async def _cached_generate(req: GenerateRequest) -> Tuple[str, List[Dict[str, Any]], MarketContextInput]:
+    key = cache_key(req.model_dump())
+    return await _RESULTS.get_or_compute(key, lambda: _shared_generate(req, key))
+
+# precompiled validator: parse the raw body in pydantic-core's JSON parser,
+# skipping FastAPI's body-dependency machinery
+REQ_ADAPTER = TypeAdapter(GenerateRequest)
+
+@app.post(
+    "/market-context",
+    response_model=GenerateResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": GenerateRequest.model_json_schema()}},
+    }},
+)
+async def generate(request: Request):
+    body = await request.body()
+    try:
+        req = REQ_ADAPTER.validate_json(body)
+    except ValidationError as e:
+        # errors echo the raw input; undecodable bytes would crash the 422 encoder
+        try:
+            body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="There was an error parsing the body")
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
+    _check_request(req)
+    md, events, payload = await _cached_generate(req)
+    words, paras = _count_stats(md)
+    # payload JSON comes straight from pydantic-core and is spliced in as-is;
+    # response_model stays for the OpenAPI schema only
+    body = orjson.dumps({
+        "market_context_markdown": md,
+        "payload": orjson.Fragment(payload.model_dump_json()),
+        "events": events,
+        "stats": {"words": words, "paragraphs": paras},
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+    return Response(content=body, media_type="application/json")
+
+def _sse(data: Any, event: Optional[str] = None) -> bytes:
+    # JSON-encode every data field so newlines in markdown chunks can't break SSE framing
+    head = f"event: {event}\n" if event else ""
+    return head.encode() + b"data: " + orjson.dumps(data) + b"\n\n"
+
+async def _sse_cached(md: str, events: List[Dict[str, Any]], payload: MarketContextInput) -> AsyncIterator[bytes]:
+    # same event sequence as a live run, with the whole markdown in one chunk
+    yield _sse({"payload": payload.model_dump(mode="json"), "events": events}, event="meta")
+    yield _sse(md)
+    words, paras = _count_stats(md)
+    yield _sse({"words": words, "paragraphs": paras}, event="done")
+
+async def _sse_generate(req: GenerateRequest, payload: MarketContextInput, key: str,
+                        notes: List[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    try:
+        # no yield inside the block: the context var must be reset in the context that set it
+        with collect_av_notes(notes):
+            events, cal = await _events_and_calendar(req, payload)
+        yield _sse({"payload": payload.model_dump(mode="json"), "events": events}, event="meta")
+        async for kind, text in generate_market_context_stream(
+            payload=payload,
+            events=events,
+            calendar_hints=cal,
+            max_retries=2,
+            para_min=req.para_min,
+            para_max=req.para_max,
+            model=req.openai_model,
+        ):
+            if kind == "delta":
+                yield _sse(text)
+            elif kind == "retry":
+                yield _sse(text, event="retry")
+            else:
+                # write back so the next identical request (streamed or not) skips the LLM,
+                # unless some upstream series came back as an AV note/error
+                if not notes:
+                    _RESULTS.set(key, (text, events, payload))
+                    await _shared_set(key, text, events, payload)
+                words, paras = _count_stats(text)
+                yield _sse({"words": words, "paragraphs": paras}, event="done")
+    except Exception as e:
+        yield _sse(f"generation error: {str(e)}", event="error")
 
-    return GenerateResponse(
-        market_context_markdown=md,
-        payload=payload.model_dump(),
-        events=events,
-        stats={"words": _word_count(md), "paragraphs": _para_count(md)},
+@app.get("/market-context/stream")
+async def market_context_stream(
+    period: str = Query(..., description="Q# YYYY or YYYY-MM-DD to YYYY-MM-DD"),
+    market_region: str = Query(...),
+    benchmark: str = Query(...),
+    para_min: int = Query(2),
+    para_max: int = Query(4),
+    z_threshold: float = Query(1.5),
+    max_events: int = Query(3),
+    openai_model: Optional[str] = Query(None),
+):
+    """Server-sent events: `meta` (payload + events), unnamed `data` markdown
+    chunks, `retry` when a draft is regenerated, then `done` (stats) or `error`.
+    A cached result is replayed as `meta`, one `data` chunk, then `done`."""
+    req = GenerateRequest(
+        period=period,
+        market_region=market_region,
+        benchmark=benchmark,
+        para_min=para_min,
+        para_max=para_max,
+        z_threshold=z_threshold,
+        max_events=max_events,
+        openai_model=openai_model,
+    )
+    _check_request(req)
+    # shares the result caches with POST /market-context
+    key = cache_key(req.model_dump())
+    hit = _RESULTS.get(key)
+    if hit is None:
+        shared = await _shared_get(key)
+        if shared is not None:
+            # only a Redis hit is copied in-process; re-setting a local hit would push its expiry out
+            hit = shared.value
+            _RESULTS.set(key, hit, shared.ttl_s)
+    if hit is not None:
+        body = _sse_cached(*hit)
+    else:
+        # build before streaming so bad input still gets a proper 400
+        with collect_av_notes() as notes:
+            payload = await _build_payload(req)
+        body = _sse_generate(req, payload, key, notes)
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-# api_service.py (replace your /app handler with this)
-@app.get("/app", response_class=HTMLResponse)
-def app_page():
-    return """
+_APP_HTML = """
 <!doctype html>
 <meta charset="utf-8">
 <title>Market Context Generator</title>
@@ -308,7 +540,9 @@ async function loadPresets(){
   regionSel.dispatchEvent(new Event('change'));
 }
 
-async function generate(){
+let stream = null;
+
+function generate(){
   const period = el('period').value;
   const regionOpt = el('region').options[el('region').selectedIndex];
   const market_region = regionOpt.textContent; // use the label from presets
@@ -317,30 +551,38 @@ async function generate(){
   const para_max = parseInt(el('pmax').value || "4");
   const z_threshold = parseFloat(el('z').value || "1.5");
   const max_events = parseInt(el('me').value || "3");
+  const qs = new URLSearchParams({period, market_region, benchmark, para_min, para_max, z_threshold, max_events}).toString();
 
-  el('raw').href = "/market-context/raw?" + new URLSearchParams({period, market_region, benchmark}).toString();
+  el('raw').href = "/market-context/raw?" + qs;
   el('msg').textContent = "Working...";
   el('go').disabled = true;
-
-  try {
-    const r = await fetch('/market-context', {
-      method:'POST',
-      headers:{'Content-Type':'application/json'},
-      body: JSON.stringify({ period, market_region, benchmark, para_min, para_max, z_threshold, max_events })
-    });
-    const j = await r.json();
-    if(!r.ok) throw new Error(j.detail || "Request failed");
-    el('out-md').textContent = j.market_context_markdown || '';
-    el('preview').innerHTML = marked.parse(j.market_context_markdown || '');
-    el('out-stats').textContent = JSON.stringify(j.stats, null, 2);
+  ['out-md', 'out-stats', 'out-events', 'out-payload'].forEach(id => el(id).textContent = '');
+  el('preview').innerHTML = '';
+
+  // render the markdown progressively as the server streams it
+  if (stream) stream.close();
+  stream = new EventSource('/market-context/stream?' + qs);
+  let md = '';
+  const finish = (msg)=>{ stream.close(); stream = null; el('msg').textContent = msg; el('go').disabled = false; };
+  stream.addEventListener('meta', (e)=>{
+    const j = JSON.parse(e.data);
     el('out-events').textContent = JSON.stringify(j.events, null, 2);
     el('out-payload').textContent = JSON.stringify(j.payload, null, 2);
-    el('msg').textContent = "Done.";
-  } catch(e) {
-    el('msg').textContent = "Error: " + e.message;
-  } finally {
-    el('go').disabled = false;
-  }
+  });
+  stream.onmessage = (e)=>{
+    md += JSON.parse(e.data);
+    el('out-md').textContent = md;
+    el('preview').innerHTML = marked.parse(md);
+  };
+  stream.addEventListener('retry', ()=>{ md = ''; el('msg').textContent = "Revising draft..."; });
+  stream.addEventListener('done', (e)=>{
+    el('out-stats').textContent = JSON.stringify(JSON.parse(e.data), null, 2);
+    finish("Done.");
+  });
+  // fires for server-sent `error` events (with data) and for connection failures (without)
+  stream.addEventListener('error', (e)=>{
+    finish("Error: " + (e.data ? JSON.parse(e.data) : "request failed (open raw for details)"));
+  });
 }
 
 document.getElementById('go').addEventListener('click', (e)=>{ e.preventDefault(); generate(); });
@@ -353,9 +595,7 @@ loadPresets();
 </script>
 """
 
-@app.get("/ui", response_class=HTMLResponse)
-def ui():
-    return """
+_UI_HTML = """
 <!doctype html>
 <meta charset="utf-8">
 <title>Market Context Generator</title>
@@ -436,7 +676,35 @@ f.addEventListener('submit', run);
 </script>
 """
 
+# static pages: encode and hash once, answer revalidations with 304
+_APP_HTML_BYTES = _APP_HTML.encode("utf-8")
+_UI_HTML_BYTES = _UI_HTML.encode("utf-8")
+_APP_ETAG = f'"{hashlib.md5(_APP_HTML_BYTES).hexdigest()}"'
+_UI_ETAG = f'"{hashlib.md5(_UI_HTML_BYTES).hexdigest()}"'
+
+def _html_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"Cache-Control": "public, max-age=3600", "ETag": etag}
+    inm = request.headers.get("if-none-match")
+    if inm and (inm.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in inm.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html", headers=headers)
+
+@app.get("/app", response_class=HTMLResponse)
+async def app_page(request: Request):
+    return _html_response(request, _APP_HTML_BYTES, _APP_ETAG)
+
+@app.get("/ui", response_class=HTMLResponse)
+async def ui(request: Request):
+    return _html_response(request, _UI_HTML_BYTES, _UI_ETAG)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("api_service:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")), reload=False)
\ No newline at end of file
+    uvicorn.run(
+        "api_service:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        reload=False,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+    )
\ No newline at end of file
@@ -0,0 +1,88 @@
+# batch_generate.py
+from __future__ import annotations
+import os
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+import httpx
+from ingest_normalize import (
+    AV_LIMITS,
+    build_market_context_payload_async,
+    daily_prices_for_benchmark_async,
+    detect_outsized_moves_from_prices,
+    curated_macro_calendar_async,
+    parse_period,
+)
+from generate_market_context import aclose_async_client, generate_market_context_async
+from rate_limit import TokenBucket
+
+
+@dataclass(frozen=True)
+class Spec:
+    period: str
+    market_region: str
+    benchmark: str
+    z_threshold: float = 1.5
+    max_events: int = 3
+    para_min: int = 2
+    para_max: int = 4
+    model: Optional[str] = None
+
+
+async def _generate_one(spec: Spec, client: httpx.AsyncClient, llm_slots: asyncio.Semaphore,
+                        llm_bucket: Optional[TokenBucket]) -> str:
+    period = parse_period(spec.period)
+    # Alpha Vantage responses are TTL-cached and single-flight, so specs sharing a period
+    # share one fetch per macro series and specs sharing a benchmark one price download
+    payload = await build_market_context_payload_async(period, spec.market_region, spec.benchmark, client=client)
+    px, cal = await asyncio.gather(
+        daily_prices_for_benchmark_async(period, spec.benchmark, client=client),
+        curated_macro_calendar_async(period, client=client),
+    )
+    events = await asyncio.to_thread(detect_outsized_moves_from_prices, px, z=spec.z_threshold, max_events=spec.max_events)
+    async with llm_slots:
+        if llm_bucket is not None:
+            await llm_bucket.acquire()
+        return await generate_market_context_async(payload, events, cal, para_min=spec.para_min,
+                                                   para_max=spec.para_max, model=spec.model)
+
+
+async def generate_market_context_batch_async(
+    specs: Sequence[Spec],
+    max_concurrency: int = 8,
+    llm_rpm: Optional[float] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    return_exceptions: bool = False,
+) -> List[Union[str, BaseException]]:
+    """Generate Market Context for many specs concurrently.
+
+    Data fetches for all specs run at once on one pooled client (bounded by
+    the Alpha Vantage semaphore/rate limit in ingest_normalize); at most
+    ``max_concurrency`` generations talk to the LLM at a time, and
+    ``llm_rpm`` (default OPENAI_RPM) caps how many start per minute.
+    Identical specs are generated once. Results are in input order; with
+    ``return_exceptions`` a failed spec yields its exception instead of
+    aborting the batch.
+    """
+    if client is None:
+        async with httpx.AsyncClient(limits=AV_LIMITS, timeout=30) as c:
+            return await generate_market_context_batch_async(specs, max_concurrency=max_concurrency, llm_rpm=llm_rpm,
+                                                             client=c, return_exceptions=return_exceptions)
+    rpm = llm_rpm if llm_rpm is not None else (float(os.environ["OPENAI_RPM"]) if os.getenv("OPENAI_RPM") else None)
+    llm_bucket = TokenBucket.per_minute(rpm) if rpm else None
+    llm_slots = asyncio.Semaphore(max_concurrency)
+    unique = list(dict.fromkeys(specs))
+    results = await asyncio.gather(*(_generate_one(s, client, llm_slots, llm_bucket) for s in unique),
+                                   return_exceptions=return_exceptions)
+    by_spec = dict(zip(unique, results))
+    return [by_spec[s] for s in specs]
+
+
+def generate_market_context_batch(specs: Sequence[Spec], **kwargs) -> List[Union[str, BaseException]]:
+    async def main() -> List[Union[str, BaseException]]:
+        try:
+            return await generate_market_context_batch_async(specs, **kwargs)
+        finally:
+            # the LLM client is per loop; release its pool before asyncio.run closes this one
+            await aclose_async_client()
+    return asyncio.run(main())
@@ -1,23 +1,51 @@
 from typing import List, Optional, Tuple, Dict, Any
-from pydantic import BaseModel, Field, ValidationError, root_validator, validator, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, root_validator, validator, field_validator, model_validator
+from pydantic_core import PydanticCustomError
 import re
 from datetime import datetime
 import json
 import string
 
 FUND_TERMS_RE = re.compile(
-    r'\b(we|our|us|the fund|portfolio|overweight|underweight|selection|allocation)\b',
+    r'\b(?:we|our|us|the fund|portfolio|overweight|underweight|selection|allocation)\b',
     flags=re.IGNORECASE
 )
 
 PERIOD_Q_RE = re.compile(r'^(Q[1-4]\s20\d{2})$')
 PERIOD_RANGE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}\s+to\s+\d{4}-\d{2}-\d{2}$')
-
-def _reject_fund_terms(text: Optional[str], field: str, errors: List[str]) -> None:
-    if not text:
-        return
-    if FUND_TERMS_RE.search(text):
-        errors.append(f"{field}: contains forbidden fund-specific language")
+PERIOD_FORMAT_MSG = "period must be 'Q# YYYY' or 'YYYY-MM-DD to YYYY-MM-DD'"
+
+def is_valid_period(period: str) -> bool:
+    return bool(PERIOD_Q_RE.match(period) or PERIOD_RANGE_RE.match(period))
+
+def _no_fund_terms(v: Any) -> Any:
+    # runs as an after-validator, inline with pydantic-core's single validation pass
+    if isinstance(v, str):
+        if FUND_TERMS_RE.search(v):
+            raise PydanticCustomError("fund_terms", "contains forbidden fund-specific language")
+    elif isinstance(v, list):
+        for i, s in enumerate(v):
+            if isinstance(s, str) and FUND_TERMS_RE.search(s):
+                raise PydanticCustomError("fund_terms", "contains forbidden fund-specific language", {"index": i})
+    return v
+
+def _loc_str(loc: Tuple[Any, ...]) -> str:
+    out = ""
+    for part in loc:
+        out += f"[{part}]" if isinstance(part, int) else (f".{part}" if out else str(part))
+    return out
+
+# immutable, whitespace-normalized models with schemas compiled at import time;
+# instances are built once per request and never mutated afterwards. frozen only
+# blocks assignment: hash() raises TypeError once a list field (Macro,
+# MarketContextInput) is populated, so don't use them as dict or lru_cache keys
+_MODEL_CONFIG = ConfigDict(
+    frozen=True,
+    validate_assignment=False,
+    extra="ignore",
+    str_strip_whitespace=True,
+    defer_build=False,
+)
 
 def _date_iso(s: str) -> bool:
     try:
@@ -27,6 +55,8 @@ def _date_iso(s: str) -> bool:
         return False
     
 class IndexEvent(BaseModel):
+    model_config = _MODEL_CONFIG
+
     date: str = Field(..., description="ISO date, e.g., 2025-04-08")
     description: str
     one_day_move_pct: Optional[float] = None
@@ -38,6 +68,8 @@ class IndexEvent(BaseModel):
         return v
 
 class Macro(BaseModel):
+    model_config = _MODEL_CONFIG
+
     inflation: Optional[str] = None
     policy_rate: Optional[str] = None
     yields: Optional[str] = None
@@ -48,22 +80,46 @@ class Macro(BaseModel):
     commodities: Optional[str] = None
     policy_geopolitics: Optional[List[str]] = None
 
+    @field_validator("*", mode="after")
+    def no_fund_terms(cls, v):
+        return _no_fund_terms(v)
+
 class BreadthConcentration(BaseModel):
+    model_config = _MODEL_CONFIG
+
     description: Optional[str] = None
     top_names_contribution_pct: Optional[str] = None
     advance_decline: Optional[str] = None
 
+    @field_validator("*", mode="after")
+    def no_fund_terms(cls, v):
+        return _no_fund_terms(v)
+
 class SectorTheme(BaseModel):
+    model_config = _MODEL_CONFIG
+
     sector: str
     theme: str
 
+    @field_validator("*", mode="after")
+    def no_fund_terms(cls, v):
+        return _no_fund_terms(v)
+
 class StyleRotation(BaseModel):
+    model_config = _MODEL_CONFIG
+
     value_vs_growth: Optional[str] = None
     size: Optional[str] = None
     quality: Optional[str] = None
     volatility: Optional[str] = None
 
+    @field_validator("*", mode="after")
+    def no_fund_terms(cls, v):
+        return _no_fund_terms(v)
+
 class MarketContextInput(BaseModel):
+    model_config = _MODEL_CONFIG
+
     period: str
     market_region: str
     benchmark: str
@@ -80,9 +136,13 @@ class MarketContextInput(BaseModel):
 
     @field_validator("period")
     def period_format(cls, v):
-        if PERIOD_Q_RE.match(v) or PERIOD_RANGE_RE.match(v):
+        if is_valid_period(v):
             return v
-        raise ValueError("period must be 'Q# YYYY' or 'YYYY-MM-DD to YYYY-MM-DD'")
+        raise ValueError(PERIOD_FORMAT_MSG)
+
+    @field_validator("market_region", "benchmark", "qualitative_market_move", "disclaimers", mode="after")
+    def no_fund_terms(cls, v):
+        return _no_fund_terms(v)
 
     @field_validator("benchmark_return_total_pct")
     def return_bounds(cls, v):
@@ -92,17 +152,13 @@ class MarketContextInput(BaseModel):
             raise ValueError("benchmark_return_total_pct must be between -100 and 100")
         return v
 
-    @model_validator(mode='before')
-    def required_combo(cls, values, info):
-        period = values.get("period")
-        benchmark = values.get("benchmark")
-        ret = values.get("benchmark_return_total_pct")
-        qual = values.get("qualitative_market_move")
-        if not period or not benchmark:
+    @model_validator(mode='after')
+    def required_combo(self):
+        if not self.period or not self.benchmark:
             raise ValueError("required: period and benchmark")
-        if ret is None and not qual:
+        if self.benchmark_return_total_pct is None and not self.qualitative_market_move:
             raise ValueError("required: at least one of benchmark_return_total_pct or qualitative_market_move")
-        return values
+        return self
 
 
 
@@ -113,34 +169,17 @@ def validate_payload(payload: Dict[str, Any]) -> Tuple[Optional[MarketContextInp
     try:
         obj = MarketContextInput(**payload)
     except ValidationError as ve:
-        errors.extend([e['msg'] if isinstance(e, dict) else str(e) for e in ve.errors()])
+        # fund-term checks run inside the schema; report them against their field
+        for e in ve.errors():
+            if e["type"] == "fund_terms":
+                loc = _loc_str(e["loc"])
+                if "index" in e.get("ctx", {}):
+                    loc += f"[{e['ctx']['index']}]"
+                errors.append(f"{loc}: {e['msg']}")
+            else:
+                errors.append(e["msg"])
         return None, errors
 
-    # Content sanitation (forbidden fund-specific language)
-    _reject_fund_terms(obj.market_region, "market_region", errors)
-    _reject_fund_terms(obj.benchmark, "benchmark", errors)
-    _reject_fund_terms(obj.qualitative_market_move, "qualitative_market_move", errors)
-    if obj.macro:
-        for k, v in obj.macro.model_dump().items():
-            if isinstance(v, str):
-                _reject_fund_terms(v, f"macro.{k}", errors)
-            elif isinstance(v, list):
-                for i, s in enumerate(v):
-                    _reject_fund_terms(s, f"macro.policy_geopolitics[{i}]", errors)
-    if obj.breadth_concentration:
-        for k, v in obj.breadth_concentration.model_dump().items():
-            if isinstance(v, str):
-                _reject_fund_terms(v, f"breadth_concentration.{k}", errors)
-    if obj.sector_themes:
-        for i, st in enumerate(obj.sector_themes):
-            _reject_fund_terms(st.sector, f"sector_themes[{i}].sector", errors)
-            _reject_fund_terms(st.theme, f"sector_themes[{i}].theme", errors)
-    if obj.style_rotation:
-        for k, v in obj.style_rotation.model_dump().items():
-            if isinstance(v, str):
-                _reject_fund_terms(v, f"style_rotation.{k}", errors)
-    _reject_fund_terms(obj.disclaimers, "disclaimers", errors)
-
     # Numeric sanity checks beyond schema
     if obj.index_level_events:
         for i, ev in enumerate(obj.index_level_events):
@@ -1,15 +1,57 @@
 from __future__ import annotations
-import os, json, re, math, textwrap
-from typing import List, Tuple
+import os, re, math, textwrap
+import orjson
+import asyncio
+import contextlib
+import weakref
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+from typing import AsyncIterator, Iterator, List, Tuple
 from pydantic import BaseModel
 from typing import Optional
 from commentary_schema import MarketContextInput, validate_payload
+from ingest_normalize import _region_bucket
 
-FORBIDDEN = re.compile(r'\b(we|our|us|the fund|portfolio|overweight|underweight|selection|allocation)\b', re.I)
+FORBIDDEN_TERMS = ("we", "our", "us", "the fund", "portfolio", "overweight", "underweight", "selection", "allocation")
+FORBIDDEN = re.compile(r'\b(' + "|".join(map(re.escape, FORBIDDEN_TERMS)) + r')\b', re.I)
+
+try:
+    import ahocorasick
+except ImportError:     # optional: fall back to the FORBIDDEN regex
+    ahocorasick = None
+
+if ahocorasick is not None:
+    _FORBIDDEN_AC = ahocorasick.Automaton()
+    for _term in FORBIDDEN_TERMS:
+        _FORBIDDEN_AC.add_word(_term, len(_term))
+    _FORBIDDEN_AC.make_automaton()
+
+def _is_word_char(c: str) -> bool:
+    # same definition as \w in a str pattern
+    return c.isalnum() or c == "_"
+
+def has_forbidden(text: str) -> bool:
+    """FORBIDDEN.search(text) is not None, in one linear automaton pass when available."""
+    if ahocorasick is None:
+        return FORBIDDEN.search(text) is not None
+    low = text.lower()
+    last = len(low) - 1
+    for end, n in _FORBIDDEN_AC.iter(low):
+        start = end - n + 1
+        # keep the regex's \b semantics: "us" in "thus" or "usual" is not a hit
+        if (start == 0 or not _is_word_char(low[start - 1])) and (end == last or not _is_word_char(low[end + 1])):
+            return True
+    return False
+# basic_checks runs once per attempt; compile its patterns once
+_WORD_RE = re.compile(r"\b\w[\w%\-/.]*\b")
+_PARA_SPLIT_RE = re.compile(r"\n\s*\n")
+_BRACKET_RE = re.compile(r"\[(?:.+?)\]")
+_FORBIDDEN_ERR = "contains forbidden fund/attribution terms"
 api_key = os.getenv("OPENAI_API_KEY")
 
 def to_compact_json(model: MarketContextInput) -> str:
-    return json.dumps(model.model_dump(), separators=(",", ":"), ensure_ascii=False)
+    # one pydantic-core pass; already compact and non-ASCII-preserving
+    return model.model_dump_json()
 
 def _region_guard(model: MarketContextInput) -> str:
     r = model.market_region.strip()
@@ -19,8 +61,8 @@ def _region_guard(model: MarketContextInput) -> str:
         "Do not generalize across regions."
     )
 
-def assemble_messages(payload: MarketContextInput, events_narrative: Optional[str], para_min=2, para_max=4) -> List[dict]:
-    system_rules = (
+def _context_rules(para_min: int, para_max: int) -> str:
+    return (
         "You are an investment commentator. Write the Market Context for the specified period. "
         "Use only the data in INPUT and EVENTS. No fund/portfolio mentions. "
         "If a data point is missing, write “not provided”. Do not invent numbers. "
@@ -29,59 +71,112 @@ def assemble_messages(payload: MarketContextInput, events_narrative: Optional[st
         "Para 2: Market behavior (index return, volatility, sector trends, factor/style rotation, breadth/concentration). "
         "Include an extra paragraph only if EVENTS is non-empty, summarizing the outsized move(s) neutrally. "
         "Style: factual, concise, client-friendly. Numbers must match INPUT exactly."
-        "Select the most relevant macro items for the specified market region; less relevant items may be omitted."
+        "Select the most relevant macro items for the specified market region; less relevant items may be omitted. "
+        # the post-checks, stated up front so the first draft usually passes
+        "Never use the words we, our, us, the fund, portfolio, overweight, underweight, selection or allocation. "
+        "Separate paragraphs with one blank line. No bracketed placeholders."
     )
+
+def assemble_messages(payload: MarketContextInput, events_narrative: Optional[str], para_min=2, para_max=4) -> List[dict]:
+    system_rules = _context_rules(para_min, para_max)
     region_guard = _region_guard(payload)
     salience = "Salience guidance: " + " ".join(_salience_hints(payload))
     content = f"INPUT JSON:\n{to_compact_json(payload)}\n\nEVENTS:\n{events_narrative or '[]'}\n\n{region_guard}"
     return [{"role": "system", "content": system_rules}, {"role": "user", "content": content}]
 
 
-def _salience_hints(payload: MarketContextInput) -> list[str]:
-    mr = payload.market_region.lower()
-    hints = []
-    if "emerging" in mr:
-        hints = [
-            "Prioritize USD vs EM FX changes and commodities.",
-            "Use global rates as backdrop; avoid U.S.-centric labor unless explicitly relevant.",
-            "If policy_geopolitics keywords exist, reference them generically."
-        ]
-    elif "europe" in mr:
-        hints = [
-            "Prioritize EUR/USD and EUR/GBP and changes in rates that affect Europe.",
-            "Commodities relevant to Europe can be mentioned briefly.",
-        ]
-    else:
-        hints = [
-            "Prioritize domestic inflation, policy rate, unemployment, 10y yield.",
-            "Include USD FX only as secondary context."
-        ]
-    return hints
+_SALIENCE = {
+    "emerging": (
+        "Prioritize USD vs EM FX changes and commodities.",
+        "Use global rates as backdrop; avoid U.S.-centric labor unless explicitly relevant.",
+        "If policy_geopolitics keywords exist, reference them generically.",
+    ),
+    "europe": (
+        "Prioritize EUR/USD and EUR/GBP and changes in rates that affect Europe.",
+        "Commodities relevant to Europe can be mentioned briefly.",
+    ),
+    "default": (
+        "Prioritize domestic inflation, policy rate, unemployment, 10y yield.",
+        "Include USD FX only as secondary context.",
+    ),
+}
+
+def _salience_hints(payload: MarketContextInput) -> tuple[str, ...]:
+    return _SALIENCE[_region_bucket(payload.market_region)]
 
 
 def basic_checks(text: str, para_min=2, para_max=4) -> List[str]:
     errs: List[str] = []
     if not text.lstrip().startswith("## Market Context"):
         errs.append("must start with '## Market Context'")
-    if FORBIDDEN.search(text):
-        errs.append("contains forbidden fund/attribution terms")
-    words = re.findall(r"\b\w[\w%\-/.]*\b", text)
-    n = len(words)
+    if has_forbidden(text):
+        errs.append(_FORBIDDEN_ERR)
+    n = sum(1 for _ in _WORD_RE.finditer(text))
     if n < 150 or n > 300:
         errs.append(f"word count {n} not in [150,250]")
-    paras = [p for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+    paras = [p for p in _PARA_SPLIT_RE.split(text.strip()) if p.strip()]
     if len(paras) < para_min or len(paras) > para_max:
         errs.append(f"paragraphs not in [{para_min},{para_max}]")
-    if re.search(r"\[(?:.+?)\]", text):
+    if _BRACKET_RE.search(text):
         errs.append("found bracketed placeholder")
     return errs
 
 def make_critique(errs: List[str]) -> str:
     return "Fix these issues without changing facts: " + "; ".join(errs) + ". Keep 150–250 words."
 
-def _client():
-    from openai import OpenAI
-    return OpenAI(api_key=api_key)
+def _revision_messages(msgs: List[dict], draft: str, errs: List[str]) -> List[dict]:
+    # continue the conversation (draft as assistant turn, critique as user turn) so the
+    # provider's prompt-prefix cache covers everything already sent
+    return msgs + [{"role": "assistant", "content": draft}, {"role": "user", "content": make_critique(errs)}]
+
+# longer than any FORBIDDEN alternative, so phrases split across chunks are still seen
+_FORBIDDEN_OVERLAP = 16
+
+class _ForbiddenWatch:
+    """Scans a streamed draft for FORBIDDEN terms as words complete.
+
+    Only text up to the last whitespace is searched, so a chunk ending in
+    "us" can't trip on what turns out to be "usual".
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._scanned = 0
+
+    def feed(self, delta: str) -> bool:
+        self.text += delta
+        cut = max(self.text.rfind(" "), self.text.rfind("\n"))
+        if cut <= self._scanned:
+            return False
+        hit = FORBIDDEN.search(self.text, max(0, self._scanned - _FORBIDDEN_OVERLAP), cut) is not None
+        self._scanned = cut
+        return hit
+
+# Persistent clients: pooled HTTP/2 connections are reused across narration, drafts and
+# retries instead of paying a TCP+TLS handshake per call. The async client is kept per
+# event loop, since its connections belong to the loop that opened them.
+_LLM_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_SYNC_CLIENT: Optional[OpenAI] = None
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+def _client() -> OpenAI:
+    global _SYNC_CLIENT
+    if _SYNC_CLIENT is None:
+        _SYNC_CLIENT = OpenAI(api_key=api_key, http_client=DefaultHttpxClient(http2=True, limits=_LLM_LIMITS))
+    return _SYNC_CLIENT
+
+def _async_client() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        client = _ASYNC_CLIENTS[loop] = AsyncOpenAI(
+            api_key=api_key, http_client=DefaultAsyncHttpxClient(http2=True, limits=_LLM_LIMITS))
+    return client
+
+async def aclose_async_client() -> None:
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
 
 def _chat(messages: List[dict], model: Optional[str] = None, temperature: float = 0.2) -> str:
     client = _client()
@@ -89,47 +184,311 @@ def _chat(messages: List[dict], model: Optional[str] = None, temperature: float
     resp = client.chat.completions.create(model=mdl, messages=messages, temperature=temperature)
     return resp.choices[0].message.content.strip()
 
+def _chat_stream(messages: List[dict], model: Optional[str] = None, temperature: float = 0.2) -> Iterator[str]:
+    client = _client()
+    mdl = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    stream = client.chat.completions.create(model=mdl, messages=messages, temperature=temperature, stream=True)
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
+
+async def _chat_once_async(messages: List[dict], model: str, temperature: float) -> str:
+    resp = await _async_client().chat.completions.create(model=model, messages=messages, temperature=temperature)
+    return resp.choices[0].message.content.strip()
+
+class AsyncBatcher:
+    """Micro-batches concurrent chat calls.
+
+    Calls arriving within ``window_s`` of each other (up to ``max_batch``)
+    are drained together; identical prompts in a batch share a single
+    completion, e.g. the event narration for requests that differ only in
+    paragraph bounds.
+    """
+
+    def __init__(self, call, max_batch: int = 16, window_s: float = 0.02):
+        self._call = call
+        self.max_batch = max_batch
+        self.window_s = window_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # the loop only keeps weak refs to tasks; hold in-flight dispatches until they finish
+        self._tasks: set = set()
+
+    async def submit(self, messages: List[dict], model: str, temperature: float) -> str:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # first use, or a fresh loop (each asyncio.run in the sync wrappers)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = set()
+            self._worker = loop.create_task(self._drain())
+        fut = loop.create_future()
+        key = orjson.dumps([model, temperature, messages], option=orjson.OPT_SORT_KEYS)
+        self._queue.put_nowait((key, messages, model, temperature, fut))
+        return await fut
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            groups: dict = {}
+            for key, messages, model, temperature, fut in batch:
+                groups.setdefault(key, (messages, model, temperature, []))[3].append(fut)
+            for messages, model, temperature, futs in groups.values():
+                task = loop.create_task(self._dispatch(messages, model, temperature, futs))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, messages: List[dict], model: str, temperature: float, futs: List[asyncio.Future]) -> None:
+        try:
+            text = await self._call(messages, model, temperature)
+        except Exception as e:
+            for f in futs:
+                if not f.done():
+                    f.set_exception(e)
+            return
+        for f in futs:
+            if not f.done():
+                f.set_result(text)
+
+# Only the standalone narration call (SSE path, fast_mode=False) goes through here;
+# fused and streamed drafts call the client directly and don't pay the window.
+_BATCHER = AsyncBatcher(_chat_once_async,
+                        max_batch=int(os.getenv("LLM_BATCH_MAX", "16")),
+                        window_s=float(os.getenv("LLM_BATCH_WINDOW_MS", "20")) / 1000.0)
+
+async def _chat_async(messages: List[dict], model: Optional[str] = None, temperature: float = 0.2) -> str:
+    mdl = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    return await _BATCHER.submit(messages, mdl, temperature)
+
+async def _chat_stream_async(messages: List[dict], model: Optional[str] = None,
+                             temperature: float = 0.2) -> AsyncIterator[str]:
+    mdl = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    stream = await _async_client().chat.completions.create(model=mdl, messages=messages, temperature=temperature,
+                                                           stream=True)
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # an early abort must release the connection back to the shared pool
+        await stream.close()
+
+# A draft is streamed and abandoned as soon as a forbidden term appears; returns (text, aborted).
+def _draft(msgs: List[dict], model: Optional[str] = None) -> Tuple[str, bool]:
+    watch = _ForbiddenWatch()
+    with contextlib.closing(_chat_stream(msgs, model=model, temperature=0.2)) as stream:
+        for delta in stream:
+            if watch.feed(delta):
+                return watch.text.strip(), True
+    return watch.text.strip(), False
+
+async def _draft_async(msgs: List[dict], model: Optional[str] = None) -> Tuple[str, bool]:
+    watch = _ForbiddenWatch()
+    async with contextlib.aclosing(_chat_stream_async(msgs, model=model, temperature=0.2)) as stream:
+        async for delta in stream:
+            if watch.feed(delta):
+                return watch.text.strip(), True
+    return watch.text.strip(), False
+
+def _draft_errors(text: str, aborted: bool, para_min: int, para_max: int) -> List[str]:
+    return [_FORBIDDEN_ERR] if aborted else basic_checks(text, para_min=para_min, para_max=para_max)
+
 # Event narration
-def narrate_events_with_llm(events: List[dict], calendar_hints: List[str], market_region: str, benchmark: str,
-                            model: Optional[str] = None) -> str:
-    if not events:
-        return "[]"
-    sys = (
-        "You convert index move flags into short neutral narratives for a 'notable events' paragraph. "
-        "Avoid fund terms. Do not fabricate causes. If unsure, attribute to 'headline-driven volatility' or 'macro releases'. "
-        "One compact sentence per event; include the date and the magnitude with % sign. Keep region context."
-    )
+_NARRATION_RULES = (
+    "You convert index move flags into short neutral narratives for a 'notable events' paragraph. "
+    "Avoid fund terms. Do not fabricate causes. If unsure, attribute to 'headline-driven volatility' or 'macro releases'. "
+    "One compact sentence per event; include the date and the magnitude with % sign. Keep region context."
+)
+
+def _narration_messages(events: List[dict], calendar_hints: List[str], market_region: str, benchmark: str) -> List[dict]:
+    sys = _NARRATION_RULES
     usr = {
         "events": events,                      # e.g., [{'date':'2025-04-08','pct':3.2}, ...]
         "calendar_hints": calendar_hints,      # e.g., ['CPI:Headline CPI 3.1% YoY', 'FOMC:Fed funds rate 5.25%']
         "region": market_region,
         "benchmark": benchmark
     }
-    messages = [{"role": "system", "content": sys},
-                {"role": "user", "content": json.dumps(usr, ensure_ascii=False)}]
-    text = _chat(messages, model=model, temperature=0.2)
+    return [{"role": "system", "content": sys},
+            {"role": "user", "content": orjson.dumps(usr).decode()}]
+
+def _narration_lines(text: str) -> str:
     lines = [ln.strip() for ln in re.split(r"[;\n]+", text) if ln.strip()]
     # Return as JSON-ish list to feed into the main generator
-    return json.dumps(lines, ensure_ascii=False)
+    return orjson.dumps(lines).decode()
+
+# Fused narration + context: one structured call instead of narrate-then-write
+_FUSED_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "market_context",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "events_narrative": {"type": "array", "items": {"type": "string"}},
+                "market_context": {"type": "string"},
+            },
+            "required": ["events_narrative", "market_context"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+def _fused_messages(payload: MarketContextInput, events: List[dict], calendar_hints: List[str],
+                    para_min: int, para_max: int) -> List[dict]:
+    sys = (
+        "Work in two steps and answer with JSON only. "
+        "Step 1, events_narrative: " + _NARRATION_RULES + " "
+        "Step 2, market_context (markdown): " + _context_rules(para_min, para_max) + " "
+        "In step 2, EVENTS means your events_narrative from step 1."
+    )
+    events_in = {"events": events, "calendar_hints": calendar_hints,
+                 "region": payload.market_region, "benchmark": payload.benchmark}
+    content = (f"INPUT JSON:\n{to_compact_json(payload)}\n\n"
+               f"EVENT FLAGS:\n{orjson.dumps(events_in).decode()}\n\n{_region_guard(payload)}")
+    return [{"role": "system", "content": sys}, {"role": "user", "content": content}]
+
+def _fused_result(raw: str) -> Tuple[str, str]:
+    obj = orjson.loads(raw)
+    lines = [ln.strip() for ln in obj.get("events_narrative") or [] if ln and ln.strip()]
+    return orjson.dumps(lines).decode(), (obj.get("market_context") or "").strip()
+
+def _fused_draft(payload: MarketContextInput, events: List[dict], calendar_hints: List[str],
+                 para_min: int, para_max: int, model: Optional[str] = None) -> Tuple[str, str]:
+    client = _client()
+    mdl = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    resp = client.chat.completions.create(model=mdl, temperature=0.2, response_format=_FUSED_SCHEMA,
+                                          messages=_fused_messages(payload, events, calendar_hints, para_min, para_max))
+    return _fused_result(resp.choices[0].message.content)
+
+async def _fused_draft_async(payload: MarketContextInput, events: List[dict], calendar_hints: List[str],
+                             para_min: int, para_max: int, model: Optional[str] = None) -> Tuple[str, str]:
+    mdl = model or os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    resp = await _async_client().chat.completions.create(model=mdl, temperature=0.2, response_format=_FUSED_SCHEMA,
+                                                         messages=_fused_messages(payload, events, calendar_hints, para_min, para_max))
+    return _fused_result(resp.choices[0].message.content)
+
+def narrate_events_with_llm(events: List[dict], calendar_hints: List[str], market_region: str, benchmark: str,
+                            model: Optional[str] = None) -> str:
+    if not events:
+        return "[]"
+    messages = _narration_messages(events, calendar_hints, market_region, benchmark)
+    text = _chat(messages, model=model, temperature=0.2)
+    return _narration_lines(text)
+
+async def narrate_events_with_llm_async(events: List[dict], calendar_hints: List[str], market_region: str,
+                                        benchmark: str, model: Optional[str] = None) -> str:
+    if not events:
+        return "[]"
+    messages = _narration_messages(events, calendar_hints, market_region, benchmark)
+    text = await _chat_async(messages, model=model, temperature=0.2)
+    return _narration_lines(text)
 
 def generate_market_context(payload: MarketContextInput,
                             events: List[dict],
                             calendar_hints: List[str],
                             max_retries: int = 2,
                             para_min: int = 2,
-                            para_max: int = 4) -> str:
-    events_narr = narrate_events_with_llm(events, calendar_hints, payload.market_region, payload.benchmark)
-    msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
-    text = _chat(msgs, temperature=0.2)
-    errs = basic_checks(text, para_min=para_min, para_max=para_max)
+                            para_max: int = 4,
+                            fast_mode: bool = True) -> str:
+    # fast_mode narrates events and writes the first draft in one structured call;
+    # fast_mode=False keeps the original narrate-then-write pair (handy for debugging)
+    if fast_mode and events:
+        events_narr, text = _fused_draft(payload, events, calendar_hints, para_min, para_max)
+        aborted = False
+        msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
+    else:
+        events_narr = narrate_events_with_llm(events, calendar_hints, payload.market_region, payload.benchmark)
+        msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
+        text, aborted = _draft(msgs)
+    errs = _draft_errors(text, aborted, para_min, para_max)
+    retries = 0
+    while errs and retries < max_retries:
+        msgs = _revision_messages(msgs, text, errs)
+        text, aborted = _draft(msgs)
+        errs = _draft_errors(text, aborted, para_min, para_max)
+        retries += 1
+    if errs:
+        raise ValueError("Post-checks failed:\n" + "\n".join(f"- {e}" for e in errs))
+    return text
+
+
+async def generate_market_context_async(payload: MarketContextInput,
+                                        events: List[dict],
+                                        calendar_hints: List[str],
+                                        max_retries: int = 2,
+                                        para_min: int = 2,
+                                        para_max: int = 4,
+                                        model: Optional[str] = None,
+                                        fast_mode: bool = True) -> str:
+    if fast_mode and events:
+        events_narr, text = await _fused_draft_async(payload, events, calendar_hints, para_min, para_max, model=model)
+        aborted = False
+        msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
+    else:
+        events_narr = await narrate_events_with_llm_async(events, calendar_hints, payload.market_region,
+                                                          payload.benchmark, model=model)
+        msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
+        text, aborted = await _draft_async(msgs, model=model)
+    errs = _draft_errors(text, aborted, para_min, para_max)
     retries = 0
     while errs and retries < max_retries:
-        critique = make_critique(errs)
-        msgs = msgs + [{"role": "system", "content": critique}]
-        text = _chat(msgs, temperature=0.2)
-        errs = basic_checks(text, para_min=para_min, para_max=para_max)
+        msgs = _revision_messages(msgs, text, errs)
+        text, aborted = await _draft_async(msgs, model=model)
+        errs = _draft_errors(text, aborted, para_min, para_max)
         retries += 1
     if errs:
         raise ValueError("Post-checks failed:\n" + "\n".join(f"- {e}" for e in errs))
     return text
 
+async def generate_market_context_stream(payload: MarketContextInput,
+                                         events: List[dict],
+                                         calendar_hints: List[str],
+                                         max_retries: int = 2,
+                                         para_min: int = 2,
+                                         para_max: int = 4,
+                                         model: Optional[str] = None) -> AsyncIterator[Tuple[str, str]]:
+    """Streaming variant of generate_market_context.
+
+    Yields ("delta", chunk) as the model writes, ("retry", critique) when a
+    draft fails basic_checks (or trips FORBIDDEN mid-stream) and is
+    regenerated, and finally ("done", text). Raises ValueError once
+    retries are exhausted.
+    """
+    events_narr = await narrate_events_with_llm_async(events, calendar_hints, payload.market_region, payload.benchmark,
+                                                      model=model)
+    msgs = assemble_messages(payload, events_narr, para_min=para_min, para_max=para_max)
+    retries = 0
+    while True:
+        watch = _ForbiddenWatch()
+        aborted = False
+        async with contextlib.aclosing(_chat_stream_async(msgs, model=model, temperature=0.2)) as stream:
+            async for delta in stream:
+                yield "delta", delta
+                if watch.feed(delta):
+                    aborted = True
+                    break
+        text = watch.text.strip()
+        errs = _draft_errors(text, aborted, para_min, para_max)
+        if not errs:
+            yield "done", text
+            return
+        if retries >= max_retries:
+            raise ValueError("Post-checks failed:\n" + "\n".join(f"- {e}" for e in errs))
+        msgs = _revision_messages(msgs, text, errs)
+        retries += 1
+        yield "retry", make_critique(errs)
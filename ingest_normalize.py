@@ -1,24 +1,30 @@
 from __future__ import annotations
 import os
-import json
-import time
-from typing import Dict, List, Optional, Tuple
+import asyncio
+import calendar
+import contextlib
+import contextvars
+import functools
+import heapq
+import random
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import itertools
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timedelta, date
-from dateutil.relativedelta import relativedelta
-import requests
+import httpx
+import orjson
 import pandas as pd
 import numpy as np
 from dotenv import load_dotenv
+from result_cache import AsyncLRUCache, cache_key
+from rate_limit import TokenBucket
 import string, math
 from commentary_schema import (
     MarketContextInput,
-    Macro,
-    BreadthConcentration,
-    SectorTheme,
-    StyleRotation,
     IndexEvent,
-    MarketContextInput,
     validate_payload,
 )
 load_dotenv()
@@ -31,131 +37,311 @@ DATABENTO_API_KEY = os.getenv("DATABENTO_API_KEY")
 def _iso(d: date) -> str:
     return d.strftime("%Y-%m-%d")
 
-def _retry_get(url: str, params: Dict[str, str], tries: int = 3, backoff: float = 1.5) -> Dict:
+# Alpha Vantage fetches are fanned out with asyncio.gather; the semaphore caps how many
+# are in flight per event loop (asyncio primitives can't be shared across loops).
+AV_MAX_CONCURRENCY = int(os.getenv("ALPHAVANTAGE_MAX_CONCURRENCY", "8"))
+AV_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+_av_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Optional requests-per-minute budget (e.g. ALPHAVANTAGE_RPM=5 on the free tier); unset or 0 means unthrottled.
+# Shared process-wide, so concurrent builds draw from the same budget.
+_AV_RPM = float(os.getenv("ALPHAVANTAGE_RPM") or 0)
+_AV_BURST = os.getenv("ALPHAVANTAGE_BURST")
+_AV_BUCKET = TokenBucket.per_minute(_AV_RPM, float(_AV_BURST) if _AV_BURST else None) if _AV_RPM > 0 else None
+
+def _av_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _av_semaphores.get(loop)
+    if sem is None:
+        sem = _av_semaphores[loop] = asyncio.Semaphore(AV_MAX_CONCURRENCY)
+    return sem
+
+def _retry_after_s(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delta-seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (at - datetime.now(tz=at.tzinfo)).total_seconds())
+
+def _backoff_s(attempt: int, base: float, max_delay: float) -> float:
+    # exponential with jitter, so parallel fetches that failed together don't retry in lockstep
+    return min(max_delay, base * 2 ** attempt) * (0.5 + random.random() * 0.5)
+
+async def _retry_get_async(url: str, params: Dict[str, str], tries: int = 3, backoff: float = 1.5,
+                           client: Optional[httpx.AsyncClient] = None, max_delay: float = 30.0) -> Dict:
+    if client is None:
+        async with httpx.AsyncClient(limits=AV_LIMITS, timeout=30) as c:
+            return await _retry_get_async(url, params, tries=tries, backoff=backoff, client=c, max_delay=max_delay)
     for i in range(tries):
-        r = requests.get(url, params=params, timeout=30)
+        if _AV_BUCKET is not None:
+            await _AV_BUCKET.acquire()
+        try:
+            async with _av_semaphore():
+                r = await client.get(url, params=params)
+        except httpx.TransportError:
+            if i == tries - 1:
+                raise
+            await asyncio.sleep(_backoff_s(i, backoff, max_delay))
+            continue
         if r.status_code == 200:
-            return r.json()
-        time.sleep(backoff * (i + 1))
+            # full-history payloads run to megabytes; orjson parses them several times faster
+            return orjson.loads(r.content)
+        # other 4xx won't succeed on retry; 429 and 5xx might
+        if r.status_code < 500 and r.status_code != 429:
+            break
+        if i < tries - 1:
+            delay = _retry_after_s(r.headers.get("Retry-After")) if r.status_code == 429 else None
+            await asyncio.sleep(min(delay, max_delay) if delay is not None else _backoff_s(i, backoff, max_delay))
     raise RuntimeError(f"GET failed: {url} {params}")
 
+# Process-wide TTL caches in front of the network. Macro series move at most daily,
+# prices and news intraday; the cache is single-flight so concurrent builds share a fetch.
+# Daily price/FX payloads can be several MB of full history, so only the bars inside the
+# requested window are kept (~65 per quarter); every cache here lives in each worker.
+_INTRADAY_FUNCTIONS = frozenset({"NEWS_SENTIMENT"})
+_MACRO_JSON = AsyncLRUCache(maxsize=64, ttl_s=6 * 3600)
+_INTRADAY_JSON = AsyncLRUCache(maxsize=64, ttl_s=15 * 60)
+_WINDOW_BARS = AsyncLRUCache(maxsize=256, ttl_s=15 * 60)
+_DAILY_SERIES = AsyncLRUCache(maxsize=128, ttl_s=15 * 60)
+
+class _Uncacheable(Exception):
+    def __init__(self, payload: Dict):
+        self.payload = payload
+
+# AV notes/errors seen by the current build; a list shared by reference, so tasks
+# spawned by asyncio.gather (which copy the context) append to the caller's list
+_AV_NOTES: contextvars.ContextVar[Optional[List[Dict]]] = contextvars.ContextVar("_AV_NOTES", default=None)
+
+@contextlib.contextmanager
+def collect_av_notes(notes: Optional[List[Dict]] = None) -> Iterator[List[Dict]]:
+    """Collect the Alpha Vantage note/error bodies hit inside the block.
+
+    A non-empty list means some series came back degraded (rate limit,
+    bad key), so results built from it shouldn't be cached.
+    """
+    notes = notes if notes is not None else []
+    token = _AV_NOTES.set(notes)
+    try:
+        yield notes
+    finally:
+        _AV_NOTES.reset(token)
+
+def _av_note(e: _Uncacheable) -> None:
+    notes = _AV_NOTES.get()
+    if notes is not None:
+        notes.append(e.payload)
+
+async def _cached_get_async(url: str, params: Dict[str, str],
+                            client: Optional[httpx.AsyncClient] = None) -> Dict:
+    cache = _INTRADAY_JSON if params.get("function") in _INTRADAY_FUNCTIONS else _MACRO_JSON
+    try:
+        return await cache.get_or_compute(cache_key({"url": url, "params": params}),
+                                          lambda: _fetch_cacheable(url, params, client))
+    except _Uncacheable as e:
+        _av_note(e)
+        return e.payload
+
+async def _fetch_cacheable(url: str, params: Dict[str, str], client: Optional[httpx.AsyncClient]) -> Dict:
+    js = await _retry_get_async(url, params, client=client)
+    # rate-limit notes and errors come back as 200s; hand them through without caching
+    if "Note" in js or "Information" in js or "Error Message" in js:
+        raise _Uncacheable(js)
+    return js
+
+async def _cached_window_bars(params: Dict[str, str], series: str, start: date, end: date,
+                              client: Optional[httpx.AsyncClient] = None) -> Dict[str, Dict[str, str]]:
+    # the {date: bar} entries of ``series`` inside [start, end]; an AV note/error raises
+    # _Uncacheable so caches layered on top don't store a result built from it
+    url = "https://www.alphavantage.co/query"
+
+    async def fetch() -> Dict[str, Dict[str, str]]:
+        ts = (await _fetch_cacheable(url, params, client)).get(series) or {}
+        lo, hi = _iso(start), _iso(end)
+        return {d: bar for d, bar in ts.items() if lo <= d <= hi}
+
+    key = cache_key({"url": url, "params": params, "start": _iso(start), "end": _iso(end)})
+    return await _WINDOW_BARS.get_or_compute(key, fetch)
+
+def _run_sync(fn, *args, **kwargs):
+    # sync entry points (CLI) drive the async adapters on one pooled client
+    async def main():
+        async with httpx.AsyncClient(limits=AV_LIMITS, timeout=30) as client:
+            return await fn(*args, client=client, **kwargs)
+    return asyncio.run(main())
+
 def _to_df_time_series_alpha(payload: Dict, key: str) -> pd.DataFrame:
     if key not in payload:
         return pd.DataFrame()
     df = pd.DataFrame(payload[key]).T
     df.index = pd.to_datetime(df.index)
     df = df.sort_index()
-    for c in df.columns:
-        with np.errstate(all='ignore'):
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    return df
-
-def _period_bounds(period: str) -> Tuple[date, date]:
+    return df.apply(pd.to_numeric, errors="coerce")
+
+def _to_float(v) -> float:
+    # same coercion as pd.to_numeric(errors="coerce"): AV uses "." for missing values
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _numeric_records(data: List[Dict]) -> Iterator[Tuple[str, float]]:
+    # AV economic series arrive most recent first; parsers only read the head,
+    # so walk lazily instead of materialising decades of history
+    for r in data:
+        v = _to_float(r.get("value"))
+        if not math.isnan(v):
+            yield r["date"], v
+
+@dataclass(frozen=True, slots=True)
+class PeriodSpec:
+    label: str                      # the period string as given, e.g. "Q2 2025"
+    year: int
+    quarter: Optional[int]          # None for custom date ranges
+    start: date
+    end: date
+
+Period = Union[str, PeriodSpec]
+
+@functools.lru_cache(maxsize=64)
+def parse_period(period: str) -> PeriodSpec:
     if period.startswith("Q"):
         q, y = period.split()
         year = int(y)
         qn = int(q[1])
         start_month = 3*(qn-1)+1
         start = date(year, start_month, 1)
-        end = (start + relativedelta(months=3)) - relativedelta(days=1)
-        return start, end
+        end_month = start_month + 2
+        end = date(year, end_month, calendar.monthrange(year, end_month)[1])
+        return PeriodSpec(period, year, qn, start, end)
     # Custom range: YYYY-MM-DD to YYYY-MM-DD
     s, _, e = period.partition(" to ")
-    return datetime.fromisoformat(s).date(), datetime.fromisoformat(e).date()
+    start, end = datetime.fromisoformat(s).date(), datetime.fromisoformat(e).date()
+    return PeriodSpec(period, start.year, None, start, end)
+
+def _as_period(period: Period) -> PeriodSpec:
+    return period if isinstance(period, PeriodSpec) else parse_period(period)
+
+def _period_bounds(period: Period) -> Tuple[date, date]:
+    spec = _as_period(period)
+    return spec.start, spec.end
 
 # Source adapters (Alpha Vantage)
 
-def av_cpi_series() -> Optional[str]:
+async def av_cpi_series(client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
     url = "https://www.alphavantage.co/query"
     params = {"function": "CPI", "interval": "monthly", "apikey": ALPHAVANTAGE_API_KEY}
-    js = _retry_get(url, params)
+    js = await _cached_get_async(url, params, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-    # Year-over-year calculation if not provided
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    if "value" not in df or df["value"].isna().all():
+    if next(_numeric_records(data), None) is None:
         return None
-    latest = df.iloc[-1]
-    idx = df.index.get_loc(latest.name)
-    if idx >= 12:
-        yoy = (latest["value"] / df.iloc[idx-12]["value"] - 1.0) * 100.0
+    # Year-over-year calculation if not provided
+    if len(data) > 12:
+        yoy = (_to_float(data[0].get("value")) / _to_float(data[12].get("value")) - 1.0) * 100.0
         return f"Headline CPI {yoy:.1f}% YoY"
     return "Headline CPI not provided"
 
-def av_fed_funds_rate() -> Optional[str]:
+async def av_fed_funds_rate(client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
     url = "https://www.alphavantage.co/query"
     params = {"function": "FEDERAL_FUNDS_RATE", "interval": "monthly", "apikey": ALPHAVANTAGE_API_KEY}
-    js = _retry_get(url, params)
+    js = await _cached_get_async(url, params, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    latest = df.dropna(subset=["value"]).iloc[-1]["value"]
-    return f"Fed funds rate {latest:.2f}%"
-
-def av_treasury_10y_yield() -> Optional[str]:
+    latest = next(_numeric_records(data), None)
+    if latest is None:
+        return None
+    return f"Fed funds rate {latest[1]:.2f}%"
+
+async def av_treasury_10y_yield(client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
     url = "https://www.alphavantage.co/query"
     params = {"function": "TREASURY_YIELD", "interval": "daily", "maturity": "10year", "apikey": ALPHAVANTAGE_API_KEY}
-    js = _retry_get(url, params)
+    js = await _cached_get_async(url, params, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.sort_values("date")
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    latest = df.dropna(subset=["value"]).iloc[-1]["value"]
-    return f"10y UST ~{latest:.2f}%"
+    latest = next(_numeric_records(data), None)
+    if latest is None:
+        return None
+    return f"10y UST ~{latest[1]:.2f}%"
 
 # expose this so step 3 can reuse the price series
-def daily_prices_for_benchmark(period: str, benchmark: str) -> pd.Series:
-    start, end = _period_bounds(period)
-    info = BENCHMARK_MAP.get(benchmark)
-    if not info:
-        return pd.Series(dtype=float)
-    df = _download_daily_from_alpha(info["symbol"], start, end)
+def _benchmark_series(df: pd.DataFrame, symbol: str) -> pd.Series:
     if df.empty:
         return pd.Series(dtype=float)
     s = df["adj_close"].copy()
-    s.name = info["symbol"]
+    s.name = symbol
     return s
 
+def daily_prices_for_benchmark(period: Period, benchmark: str) -> pd.Series:
+    return _run_sync(daily_prices_for_benchmark_async, period, benchmark)
+
+async def daily_prices_for_benchmark_async(period: Period, benchmark: str,
+                                           client: Optional[httpx.AsyncClient] = None) -> pd.Series:
+    start, end = _period_bounds(period)
+    info = BENCHMARK_MAP.get(benchmark)
+    if not info:
+        return pd.Series(dtype=float)
+    df = await _cached_daily_series(info["symbol"], start, end, client=client)
+    return _benchmark_series(df, info["symbol"])
+
 def detect_outsized_moves_from_prices(prices: pd.Series, z: float = 1.5, max_events: int = 3) -> List[Dict]:
     if prices is None or prices.size < 5:
         return []
-    rets = prices.pct_change().dropna()
-    sigma = rets.std(ddof=1)
+    # returns on the full array: a missing price voids the returns on either side of it,
+    # as pct_change().dropna() did, instead of bridging the gap with a multi-day return
+    p = prices.to_numpy(dtype=np.float64)
+    rets = p[1:] / p[:-1] - 1.0
+    valid = ~np.isnan(rets)
+    if valid.sum() < 2:
+        return []
+    sigma = rets[valid].std(ddof=1)
     if not np.isfinite(sigma) or sigma == 0:
         return []
-    mask = rets.abs() >= (z * sigma)
-    flagged = rets.loc[mask].sort_values(key=lambda x: -x.abs())
-    events: List[Dict] = []
-    for dt, r in flagged.head(max_events).items():
-        events.append({"date": dt.strftime("%Y-%m-%d"), "pct": round(r * 100.0, 2)})
-    return events
-
-def curated_macro_calendar(period: str) -> List[str]:
+    mag = np.abs(rets)
+    flagged = np.flatnonzero(valid & (mag >= z * sigma))
+    if max_events <= 0 or flagged.size == 0:
+        return []
+    if flagged.size > max_events:
+        # top-k without sorting every flagged move; ties on the cut-off keep the earliest dates
+        m = mag[flagged]
+        cut = -np.partition(-m, max_events - 1)[max_events - 1]
+        above = flagged[m > cut]
+        flagged = np.concatenate((above, flagged[m == cut][:max_events - above.size]))
+    # largest moves first, earlier date on ties
+    top = flagged[np.lexsort((flagged, -mag[flagged]))]
+    dates = prices.index[top + 1]
+    return [{"date": d.strftime("%Y-%m-%d"), "pct": round(float(r) * 100.0, 2)} for d, r in zip(dates, rets[top])]
+
+def curated_macro_calendar(period: Period) -> List[str]:
+    return _run_sync(curated_macro_calendar_async, period)
+
+async def curated_macro_calendar_async(period: Period, client: Optional[httpx.AsyncClient] = None) -> List[str]:
+    # the three adapters are independent; fetch them concurrently
+    cpi, ffr, y10 = await asyncio.gather(
+        av_cpi_series(client=client),
+        av_fed_funds_rate(client=client),
+        av_treasury_10y_yield(client=client),
+    )
     hints: List[str] = []
-    cpi = av_cpi_series()
     if cpi:
         hints.append(f"CPI:{cpi}")
-    ffr = av_fed_funds_rate()
     if ffr:
         hints.append(f"FOMC:{ffr}")
-    y10 = av_treasury_10y_yield()
     if y10:
         hints.append(f"UST10Y:{y10}")
     return hints
@@ -173,122 +359,150 @@ FX_REGION_MAP = {
     "uk": [("GBP","USD"), ("EUR","GBP")],
 }
 
-def _region_fx_pairs(market_region: str) -> list[tuple[str,str]]:
+# region strings come from a handful of presets/UI values, so resolve each once
+@functools.lru_cache(maxsize=64)
+def _region_fx_pairs(market_region: str) -> tuple[tuple[str,str], ...]:
     mr = market_region.lower()
     for k, pairs in FX_REGION_MAP.items():
         if k in mr:
-            return pairs
-    return [("EUR","USD"), ("USD","JPY")]
+            return tuple(pairs)
+    return (("EUR","USD"), ("USD","JPY"))
 
-def av_unemployment_rate() -> Optional[str]:
+async def av_unemployment_rate(client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
-    js = _retry_get("https://www.alphavantage.co/query",
-                    {"function":"UNEMPLOYMENT","apikey":ALPHAVANTAGE_API_KEY})
+    js = await _cached_get_async("https://www.alphavantage.co/query",
+                                {"function":"UNEMPLOYMENT","apikey":ALPHAVANTAGE_API_KEY}, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    latest = df.dropna(subset=["value"]).iloc[-1]
-    return f"Unemployment {latest['value']:.1f}%"
+    latest = next(_numeric_records(data), None)
+    if latest is None:
+        return None
+    return f"Unemployment {latest[1]:.1f}%"
 
-def _fx_daily_pair_df(base: str, quote: str) -> pd.DataFrame:
+async def _fx_pair_change(base: str, quote: str, start: date, end: date,
+                          client: Optional[httpx.AsyncClient] = None) -> Optional[float]:
     if not ALPHAVANTAGE_API_KEY:
-        return pd.DataFrame()
-    js = _retry_get("https://www.alphavantage.co/query", {
-        "function":"FX_DAILY", "from_symbol":base, "to_symbol":quote,
-        "outputsize":"full", "apikey":ALPHAVANTAGE_API_KEY
-    })
-    key = "Time Series FX (Daily)"
-    if key not in js:
-        return pd.DataFrame()
-    df = pd.DataFrame(js[key]).T
-    df.index = pd.to_datetime(df.index)
-    df = df.sort_index()
-    col = "4. close" if "4. close" in df.columns else list(df.columns)[-1]
-    df = df[[col]].rename(columns={col:"close"})
-    df["close"] = pd.to_numeric(df["close"], errors="coerce")
-    return df
+        return None
+    try:
+        bars = await _cached_window_bars({
+            "function":"FX_DAILY", "from_symbol":base, "to_symbol":quote,
+            "outputsize":_outputsize(start), "apikey":ALPHAVANTAGE_API_KEY
+        }, "Time Series FX (Daily)", start, end, client=client)
+    except _Uncacheable as e:
+        _av_note(e)
+        return None
+    return _fx_window_change(bars, start, end)
+
+def _window_endpoints(ts: Dict[str, Dict[str, str]], start: date, end: date) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+    # one pass over a raw AV {date: bar} dict: the first and last bar inside [start, end],
+    # or None when the window holds fewer than two bars
+    lo, hi = _iso(start), _iso(end)
+    first = last = None
+    n = 0
+    for d, bar in ts.items():
+        if lo <= d <= hi:
+            n += 1
+            if first is None or d < first[0]:
+                first = (d, bar)
+            if last is None or d > last[0]:
+                last = (d, bar)
+    if n < 2:
+        return None
+    return first[1], last[1]
 
-def fx_changes_for_period(period: str, pairs: list[tuple[str,str]]) -> list[tuple[str,float]]:
+def _fx_window_change(ts: Dict[str, Dict[str, str]], start: date, end: date) -> Optional[float]:
+    ends = _window_endpoints(ts, start, end)
+    if ends is None:
+        return None
+    def close(bar: Dict[str, str]) -> np.float64:
+        v = bar.get("4. close")
+        return np.float64(_to_float(v if v is not None else list(bar.values())[-1]))
+    ret = (close(ends[1]) / close(ends[0]) - 1.0) * 100.0
+    return float(round(ret, 2))
+
+async def fx_changes_for_period(period: Period, pairs: Sequence[tuple[str,str]],
+                                client: Optional[httpx.AsyncClient] = None) -> list[tuple[str,float]]:
     start, end = _period_bounds(period)
-    out = []
-    for base, quote in pairs:
-        df = _fx_daily_pair_df(base, quote)
-        if df.empty:
-            continue
-        s = df.loc[(df.index.date >= start) & (df.index.date <= end), "close"]
-        if len(s) < 2:
-            continue
-        ret = (s.iloc[-1] / s.iloc[0] - 1.0) * 100.0
-        out.append((f"{base}/{quote}", float(round(ret, 2))))
-    return out
+    changes = await asyncio.gather(*(_fx_pair_change(b, q, start, end, client=client) for b, q in pairs))
+    return [(f"{b}/{q}", c) for (b, q), c in zip(pairs, changes) if c is not None]
 
-def av_all_commodities_mom_yoy(period: str) -> Optional[str]:
+async def av_all_commodities_mom_yoy(period: Period, client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
-    js = _retry_get("https://www.alphavantage.co/query",
-                    {"function":"ALL_COMMODITIES","interval":"monthly","apikey":ALPHAVANTAGE_API_KEY})
+    js = await _cached_get_async("https://www.alphavantage.co/query",
+                                {"function":"ALL_COMMODITIES","interval":"monthly","apikey":ALPHAVANTAGE_API_KEY}, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    df = df.dropna().sort_values("date")
     start, end = _period_bounds(period)
-    in_q = df[(df["date"].dt.date >= start) & (df["date"].dt.date <= end)]
-    if in_q.empty:
-        latest = df.iloc[-1]
-        return f"All Commodities index {latest['value']:.1f} (period data not provided)"
-    last = in_q.iloc[-1]
+    lo, hi = _iso(start), _iso(end)
+    latest: Optional[float] = None
+    window: List[float] = []        # last in-period obs, then the 12 observations before it
+    for d, v in _numeric_records(data):
+        if latest is None:
+            latest = v
+        if window:
+            window.append(v)
+            if len(window) == 13:
+                break
+        elif d <= hi:
+            if d < lo:
+                break
+            window.append(v)
+    if latest is None:
+        return None
+    if not window:
+        return f"All Commodities index {latest:.1f} (period data not provided)"
+    last = window[0]
     # MoM vs previous monthly obs
-    prev_idx = df.index.get_loc(last.name) - 1
     mom = None
-    if prev_idx >= 0:
-        prev_val = df.iloc[prev_idx]["value"]
-        mom = (last["value"]/prev_val - 1.0)*100.0
+    if len(window) > 1:
+        mom = (last/window[1] - 1.0)*100.0
     # YoY vs 12 months back
-    idx = df.index.get_loc(last.name)
     yoy = None
-    if idx >= 12:
-        yoy = (last["value"]/df.iloc[idx-12]["value"] - 1.0)*100.0
-    parts = [f"All Commodities index {last['value']:.1f}"]
+    if len(window) > 12:
+        yoy = (last/window[12] - 1.0)*100.0
+    parts = [f"All Commodities index {last:.1f}"]
     if mom is not None and np.isfinite(mom):
         parts.append(f"MoM {mom:.1f}%")
     if yoy is not None and np.isfinite(yoy):
         parts.append(f"YoY {yoy:.1f}%")
     return "; ".join(parts)
 
-def av_real_gdp_yoy() -> Optional[str]:
+async def av_real_gdp_yoy(client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     if not ALPHAVANTAGE_API_KEY:
         return None
-    js = _retry_get("https://www.alphavantage.co/query",
-                    {"function":"REAL_GDP","interval":"annual","apikey":ALPHAVANTAGE_API_KEY})
+    js = await _cached_get_async("https://www.alphavantage.co/query",
+                                {"function":"REAL_GDP","interval":"annual","apikey":ALPHAVANTAGE_API_KEY}, client=client)
     data = js.get("data")
     if not data:
         return None
-    df = pd.DataFrame(data)
-    df["date"] = pd.to_datetime(df["date"])
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-    df = df.dropna().sort_values("date")
-    if len(df) < 2:
-        return f"Real GDP {df.iloc[-1]['value']:.1f} (YoY not provided)"
-    yoy = (df.iloc[-1]["value"]/df.iloc[-2]["value"] - 1.0)*100.0
+    recent = [v for _, v in itertools.islice(_numeric_records(data), 2)]
+    if not recent:
+        return None
+    if len(recent) < 2:
+        return f"Real GDP {recent[0]:.1f} (YoY not provided)"
+    yoy = (recent[0]/recent[1] - 1.0)*100.0
     return f"Real GDP YoY {yoy:.1f}% (annual)"
 
-def news_topics_from_av(time_from_iso: str, tickers: list[str], limit: int = 100) -> list[str]:
+NEWS_STOPWORDS = frozenset("""a an the of for to and or in on with by from into over under amid during as at vs versus via
+is are was were be been being this that these those it its their our your his her them they we you
+stocks shares market markets policy economic federal central bank rate rates inflation deflation
+growth recession expansion gdp cpi ppi""".split())
+
+async def news_topics_from_av(time_from_iso: str, tickers: Sequence[str], limit: int = 100,
+                              client: Optional[httpx.AsyncClient] = None) -> list[str]:
     if not ALPHAVANTAGE_API_KEY:
         return []
-    js = _retry_get("https://www.alphavantage.co/query", {
+    js = await _cached_get_async("https://www.alphavantage.co/query", {
         "function":"NEWS_SENTIMENT",
         "tickers": ",".join(tickers),
         "time_from": time_from_iso,
         "limit": str(limit),
         "apikey": ALPHAVANTAGE_API_KEY
-    })
+    }, client=client)
     feed = js.get("feed", [])
     if not feed:
         return []
@@ -297,28 +511,29 @@ def news_topics_from_av(time_from_iso: str, tickers: list[str], limit: int = 100
         t = (it.get("title") or "") + " " + (it.get("summary") or "")
         texts.append(t)
     blob = " ".join(texts).lower()
-    stop = set("""a an the of for to and or in on with by from into over under amid during as at vs versus via
-    is are was were be been being this that these those it its their our your his her them they we you
-    stocks shares market markets policy economic federal central bank rate rates inflation deflation
-    growth recession expansion gdp cpi ppi""".split())
-    tokens = [w.strip(string.punctuation) for w in blob.split()]
-    tokens = [w for w in tokens if len(w) > 3 and w not in stop]
-    if not tokens:
-        return []
-    vc = pd.Series(tokens).value_counts()
-    return [w for w in vc.index[:5]]
+    counts = Counter(w for w in (t.strip(string.punctuation) for t in blob.split())
+                     if len(w) > 3 and w not in NEWS_STOPWORDS)
+    return [w for w, _ in counts.most_common(5)]
 
-def _period_time_from(period: str) -> str:
+@functools.lru_cache(maxsize=64)
+def _period_time_from(period: Period) -> str:
     start, _ = _period_bounds(period)
     return f"{start.strftime('%Y%m%d')}T0000"
 
-def _region_news_tickers(market_region: str) -> list[str]:
+_NEWS_TICKERS = {
+    "emerging": ("FOREX:USD", "FOREX:CNY", "FOREX:BRL", "CRYPTO:BTC"),
+    "europe": ("FOREX:EUR", "FOREX:GBP", "FOREX:USD"),
+    "default": ("FOREX:USD", "CRYPTO:BTC"),
+}
+
+# the one region rule shared by news tickers here and salience hints in generate_market_context
+@functools.lru_cache(maxsize=64)
+def _region_bucket(market_region: str) -> str:
     mr = market_region.lower()
-    if "emerging" in mr:
-        return ["FOREX:USD", "FOREX:CNY", "FOREX:BRL", "CRYPTO:BTC"]
-    if "europe" in mr:
-        return ["FOREX:EUR", "FOREX:GBP", "FOREX:USD"]
-    return ["FOREX:USD", "CRYPTO:BTC"]
+    return "emerging" if "emerging" in mr else "europe" if "europe" in mr else "default"
+
+def _region_news_tickers(market_region: str) -> tuple[str, ...]:
+    return _NEWS_TICKERS[_region_bucket(market_region)]
 
 # Benchmarks & returns 
 
@@ -338,40 +553,79 @@ BENCHMARK_MAP = {
     "NASDAQ-100": {"symbol": "QQQ", "source": "databento_or_alpha"},
 }
 
-def _download_daily_from_alpha(symbol: str, start: date, end: date) -> pd.DataFrame:
-    if not ALPHAVANTAGE_API_KEY:
+def _outputsize(start: date) -> str:
+    # "compact" is the latest 100 trading days counted back from today (not from the
+    # period end); ~130 calendar days stays inside that with room for holidays
+    return "compact" if (date.today() - start).days <= 130 else "full"
+
+def _daily_adjusted_params(symbol: str, start: date) -> Dict[str, str]:
+    return {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": symbol, "outputsize": _outputsize(start), "apikey": ALPHAVANTAGE_API_KEY}
+
+def _adj_close_frame(bars: Dict[str, Dict[str, str]]) -> pd.DataFrame:
+    # bars are already limited to the window by _cached_window_bars
+    if not bars:
         return pd.DataFrame()
-    url = "https://www.alphavantage.co/query"
-    params = {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": symbol, "outputsize": "full", "apikey": ALPHAVANTAGE_API_KEY}
-    js = _retry_get(url, params)
-    df = _to_df_time_series_alpha(js, "Time Series (Daily)")
-    if df.empty:
-        return df
+    df = _to_df_time_series_alpha({"Time Series (Daily)": bars}, "Time Series (Daily)")
     # Use adjusted close (field '5. adjusted close') if available, else '4. close'
     col = "5. adjusted close" if "5. adjusted close" in df.columns else "4. close"
-    out = df[[col]].rename(columns={col: "adj_close"})
-    out = out.loc[(out.index.date >= start) & (out.index.date <= end)]
-    return out
+    return df[[col]].rename(columns={col: "adj_close"})
 
-def _total_return_pct_from_prices(prices: pd.Series) -> Optional[float]:
-    if prices is None or len(prices) < 2:
+async def _download_daily_from_alpha(symbol: str, start: date, end: date,
+                                     client: Optional[httpx.AsyncClient] = None) -> pd.DataFrame:
+    if not ALPHAVANTAGE_API_KEY:
+        return pd.DataFrame()
+    bars = await _cached_window_bars(_daily_adjusted_params(symbol, start), "Time Series (Daily)", start, end, client=client)
+    # pandas parsing is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(_adj_close_frame, bars)
+
+async def _cached_daily_series(symbol: str, start: date, end: date,
+                               client: Optional[httpx.AsyncClient] = None) -> pd.DataFrame:
+    # the parsed price frame, shared by concurrent and repeat event detection for a symbol;
+    # callers treat the frame as read-only
+    key = f"{symbol}|{start.isoformat()}|{end.isoformat()}"
+    try:
+        return await _DAILY_SERIES.get_or_compute(key, lambda: _download_daily_from_alpha(symbol, start, end, client=client))
+    except _Uncacheable as e:
+        # an AV note is mapped to an empty frame out here, so the empty frame isn't cached
+        _av_note(e)
+        return pd.DataFrame()
+
+async def _endpoint_prices_from_alpha(symbol: str, start: date, end: date,
+                                      client: Optional[httpx.AsyncClient] = None) -> Optional[Tuple[float, float]]:
+    # total returns only need the first and last adjusted close in the window, so read
+    # those two bars straight from the window instead of building the full frame
+    if not ALPHAVANTAGE_API_KEY:
+        return None
+    try:
+        bars = await _cached_window_bars(_daily_adjusted_params(symbol, start), "Time Series (Daily)", start, end, client=client)
+    except _Uncacheable as e:
+        _av_note(e)
+        return None
+    ends = _window_endpoints(bars, start, end)
+    if ends is None:
+        return None
+    def adj_close(bar: Dict[str, str]) -> float:
+        # Use adjusted close (field '5. adjusted close') if available, else '4. close'
+        return _to_float(bar.get("5. adjusted close", bar.get("4. close")))
+    return adj_close(ends[0]), adj_close(ends[1])
+
+def _total_return_pct_from_endpoints(ends: Optional[Tuple[float, float]]) -> Optional[float]:
+    if ends is None:
         return None
-    start, end = prices.iloc[0], prices.iloc[-1]
-    if pd.isna(start) or pd.isna(end) or start <= 0:
+    start, end = ends
+    if math.isnan(start) or math.isnan(end) or start <= 0:
         return None
     return (end / start - 1.0) * 100.0
 
-def compute_benchmark_return(period: str, benchmark: str) -> Optional[float]:
+async def compute_benchmark_return(period: Period, benchmark: str,
+                                   client: Optional[httpx.AsyncClient] = None) -> Optional[float]:
     start, end = _period_bounds(period)
     info = BENCHMARK_MAP.get(benchmark)
     if not info:
         return None
     sym = info["symbol"]
     # Try Alpha Vantage first (simple, no Databento dependency for ETFs)
-    df = _download_daily_from_alpha(sym, start, end)
-    if df.empty:
-        return None
-    return _total_return_pct_from_prices(df["adj_close"])
+    return _total_return_pct_from_endpoints(await _endpoint_prices_from_alpha(sym, start, end, client=client))
 
 #  simple sector proxies via SPDRs (if user wants sector color)
 
@@ -389,79 +643,99 @@ SECTOR_ETFS = {
     "Utilities": "XLU",
 }
 
-def sector_total_returns(period: str) -> List[Tuple[str, float]]:
+async def sector_total_returns(period: Period, client: Optional[httpx.AsyncClient] = None) -> List[Tuple[str, float]]:
     start, end = _period_bounds(period)
+    # sectors only need a total return each, so they take the endpoint path too
+    ends = await asyncio.gather(*(_endpoint_prices_from_alpha(t, start, end, client=client)
+                                  for t in SECTOR_ETFS.values()))
     out: List[Tuple[str, float]] = []
-    for sector, ticker in SECTOR_ETFS.items():
-        df = _download_daily_from_alpha(ticker, start, end)
-        if df.empty:
-            continue
-        tr = _total_return_pct_from_prices(df["adj_close"])
+    for sector, e in zip(SECTOR_ETFS, ends):
+        tr = _total_return_pct_from_endpoints(e)
         if tr is not None:
             out.append((sector, tr))
     return out
 
 def build_market_context_payload(
-    period: str,
+    period: Period,
     market_region: str,
     benchmark: str,
     index_level_events: Optional[List[IndexEvent]] = None,
     qualitative_market_move: Optional[str] = None,
 ) -> MarketContextInput:
+    return _run_sync(build_market_context_payload_async, period, market_region, benchmark,
+                     index_level_events=index_level_events, qualitative_market_move=qualitative_market_move)
+
+async def build_market_context_payload_async(
+    period: Period,
+    market_region: str,
+    benchmark: str,
+    index_level_events: Optional[List[IndexEvent]] = None,
+    qualitative_market_move: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> MarketContextInput:
+    # parse once; every adapter below takes the spec instead of re-parsing the string
+    period = _as_period(period)
+    # every source is independent: one fan-out, bounded by the per-loop AV semaphore
+    (cpi, ffr, y10, gdp, unemp, commodities,
+     bench_ret, fx_stats, topics, sector_rets) = await asyncio.gather(
+        av_cpi_series(client=client),
+        av_fed_funds_rate(client=client),
+        av_treasury_10y_yield(client=client),
+        av_real_gdp_yoy(client=client),
+        av_unemployment_rate(client=client),
+        av_all_commodities_mom_yoy(period, client=client),
+        compute_benchmark_return(period, benchmark, client=client),
+        fx_changes_for_period(period, _region_fx_pairs(market_region), client=client),
+        # news → geopolitics hints (keywords only, no claims/numbers)
+        news_topics_from_av(_period_time_from(period), _region_news_tickers(market_region), limit=200, client=client),
+        sector_total_returns(period, client=client),
+    )
     macro_lines: Dict[str, Optional[str]] = {
-        "inflation": av_cpi_series() or "not provided",
-        "policy_rate": av_fed_funds_rate() or "not provided",
-        "yields": av_treasury_10y_yield() or "not provided",
-        "growth": av_real_gdp_yoy() or "not provided",
-        "employment": av_unemployment_rate() or "not provided",
+        "inflation": cpi or "not provided",
+        "policy_rate": ffr or "not provided",
+        "yields": y10 or "not provided",
+        "growth": gdp or "not provided",
+        "employment": unemp or "not provided",
         "fx": "not provided",
         "credit": "not provided",
-        "commodities": av_all_commodities_mom_yoy(period) or "not provided",
-        "policy_geopolitics": None,
+        "commodities": commodities or "not provided",
+        "policy_geopolitics": topics if topics else ["not provided"],
     }
-
-    bench_ret = compute_benchmark_return(period, benchmark)
-
-    fx_pairs = _region_fx_pairs(market_region)
-    fx_stats = fx_changes_for_period(period, fx_pairs)
     if fx_stats:
         fx_bits = [f"{p} {v:+.2f}%" for p, v in fx_stats]
         macro_lines["fx"] = "; ".join(fx_bits)
 
-    # news → geopolitics hints (keywords only, no claims/numbers)
-    time_from = _period_time_from(period)
-    topics = news_topics_from_av(time_from, _region_news_tickers(market_region), limit=200)
-    macro_lines["policy_geopolitics"] = topics if topics else ["not provided"]
-
-    sector_rets = sector_total_returns(period)
-    sector_themes: List[SectorTheme] = []
-    if sector_rets:
-        srtd = sorted(sector_rets, key=lambda x: x[1], reverse=True)
-        for s, v in srtd[:2]:
-            sector_themes.append(SectorTheme(sector=s, theme=f"{s} led; proxy ETF return {v:.1f}%"))
-        for s, v in srtd[-2:]:
-            sector_themes.append(SectorTheme(sector=s, theme=f"{s} lagged; proxy ETF return {v:.1f}%"))
-
+    # only the two leaders and two laggards are used, so select them instead of sorting;
+    # ties resolve exactly as the old stable descending sort ([:2] and [-2:]) did
+    led = heapq.nlargest(2, sector_rets, key=lambda x: x[1])
+    lagged = [r for _, r in reversed(heapq.nsmallest(2, enumerate(sector_rets), key=lambda ir: (ir[1][1], -ir[0])))]
+    sector_themes: List[Dict[str, str]] = (
+        [{"sector": s, "theme": f"{s} led; proxy ETF return {v:.1f}%"} for s, v in led]
+        + [{"sector": s, "theme": f"{s} lagged; proxy ETF return {v:.1f}%"} for s, v in lagged]
+    )
+
+    # nested sections stay plain dicts: validate_payload validates the whole tree in one pass,
+    # instead of building each sub-model only to dump it back to a dict
     payload_dict = {
-        "period": period,
+        "period": period.label,
         "market_region": market_region,
         "benchmark": benchmark,
         "benchmark_return_total_pct": bench_ret,
         "qualitative_market_move": qualitative_market_move,
         "index_level_events": index_level_events,
-        "macro": Macro(**macro_lines).model_dump(),
-        "breadth_concentration": BreadthConcentration(
-            description="not provided",
-            top_names_contribution_pct="not provided",
-            advance_decline="not provided",
-        ).model_dump(),
-        "sector_themes": [st.model_dump() for st in sector_themes] if sector_themes else None,
-        "style_rotation": StyleRotation(
-            value_vs_growth="not provided",
-            size="not provided",
-            quality="not provided",
-            volatility="not provided",
-        ).model_dump(),
+        "macro": macro_lines,
+        "breadth_concentration": {
+            "description": "not provided",
+            "top_names_contribution_pct": "not provided",
+            "advance_decline": "not provided",
+        },
+        "sector_themes": sector_themes or None,
+        "style_rotation": {
+            "value_vs_growth": "not provided",
+            "size": "not provided",
+            "quality": "not provided",
+            "volatility": "not provided",
+        },
         "disclaimers": "No forecasts; monitoring policy path and earnings dispersion",
     }
 
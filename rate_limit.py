@@ -0,0 +1,37 @@
+from __future__ import annotations
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Loop-agnostic async token bucket.
+
+    ``acquire`` reserves a token synchronously (no await between reading and
+    updating state), so it is safe to share across tasks and event loops in
+    one thread. Tokens may go negative: that is the queue of callers already
+    promised a later slot, each of whom sleeps until their slot comes up.
+    """
+
+    def __init__(self, rate_per_s: float, capacity: float):
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self._tokens = capacity
+        self._stamp = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, rpm: float, burst: float | None = None) -> "TokenBucket":
+        if rpm <= 0:
+            raise ValueError(f"rpm must be positive, got {rpm}")
+        return cls(rpm / 60.0, burst if burst is not None else rpm)
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        self._tokens -= 1.0
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
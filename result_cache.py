@@ -0,0 +1,124 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+import orjson
+
+logger = logging.getLogger("mcg.cache")
+
+# lifetime of a generated result, in-process and in Redis alike
+RESULT_TTL_S = 86400
+
+
+class Expiring(NamedTuple):
+    # returned by a compute function to give its entry its own TTL (<= 0: don't cache)
+    value: Any
+    ttl_s: Optional[float]
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    # sorted keys so logically equal requests hash the same regardless of field order
+    return hashlib.blake2b(orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+class AsyncLRUCache:
+    """In-process LRU for coroutine results.
+
+    Concurrent misses on the same key share one in-flight computation
+    (single-flight), so N identical requests cost one upstream call.
+    Failures are propagated to every waiter and never cached. With
+    ``ttl_s`` set, entries older than that are treated as misses.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl_s: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        # key -> (expires_at, value); expires_at is inf when there is no TTL
+        self._data: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        if hit[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return hit[1]
+
+    def set(self, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        # ttl_s overrides the cache-wide TTL for this entry
+        ttl = ttl_s if ttl_s is not None else self.ttl_s
+        if ttl is not None and ttl <= 0:
+            self._data.pop(key, None)
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, compute))
+            self._inflight[key] = task
+        # shield: one caller going away must not cancel the shared computation
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            if isinstance(value, Expiring):
+                self.set(key, value.value, value.ttl_s)
+                return value.value
+            self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+
+class RedisResultStore:
+    """Cross-worker result cache on top of a redis.asyncio client.
+
+    Redis is an accelerator, not a dependency of correctness: any Redis
+    error is logged and treated as a miss.
+    """
+
+    def __init__(self, redis, prefix: str = "mcg:v1:", ttl_s: int = RESULT_TTL_S):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl_s = ttl_s
+
+    async def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        # (value, seconds left); callers copying the value in-process should keep it no longer than Redis does
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                raw, pttl = await pipe.get(self.prefix + key).pttl(self.prefix + key).execute()
+        except Exception as e:
+            logger.warning("redis get failed: %s", e)
+            return None
+        if not raw:
+            return None
+        # -1: no expiry set (written by something else); fall back to our own TTL
+        return orjson.loads(raw), pttl / 1000.0 if pttl >= 0 else float(self.ttl_s)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            # NX: first writer wins, concurrent workers don't overwrite each other
+            await self.redis.set(self.prefix + key, orjson.dumps(value), ex=self.ttl_s, nx=True)
+        except Exception as e:
+            logger.warning("redis set failed: %s", e)
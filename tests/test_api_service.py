@@ -0,0 +1,22 @@
+from fastapi.testclient import TestClient
+
+from api_service import app
+
+client = TestClient(app)
+
+
+def test_non_utf8_body_is_400():
+    r = client.post("/market-context", content=b"\xff\xfe{", headers={"Content-Type": "application/json"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "There was an error parsing the body"
+
+
+def test_invalid_json_is_422():
+    r = client.post("/market-context", content=b"{", headers={"Content-Type": "application/json"})
+    assert r.status_code == 422
+
+
+def test_missing_field_is_422():
+    r = client.post("/market-context", json={"period": "Q2 2025"})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"][0] == "body"